@@ -84,6 +84,10 @@ class Robot(Entity):
         else:
             raise ValueError(f"无效的机器人状态: {status}")
 
+    def set_states(self, updates: Dict[str, Any]):
+        """一次性批量更新多个状态字段"""
+        self.state.update(updates)
+
     def get_status(self) -> str:
         """获取机器人状态"""
         return self.get_state('status', RobotStatus.IDLE.value)
@@ -7,7 +7,7 @@
 import asyncio
 import logging
 import uuid
-from typing import Any, Dict, List, Optional, Tuple, Union, Callable
+from typing import Any, Dict, List, Optional, Set, Tuple, Union, Callable
 from datetime import datetime
 from dataclasses import dataclass, field
 
@@ -23,6 +23,9 @@ from ..events.event_bus import (
 
 logger = logging.getLogger(__name__)
 
+# 所有环境实例共用的日志器，通过LoggerAdapter附带env_id，避免按环境注册新日志器
+_BASE_LOGGER = logging.getLogger("async_task_env")
+
 
 @dataclass
 class TaskEnvironmentConfig:
@@ -89,13 +92,19 @@ class AsyncTaskEnvironment:
         # 事件订阅
         self._event_subscriptions: List[str] = []
         
+        # 后台发布中的事件任务（保持引用，关闭时统一等待）
+        self._pending_publishes: Set[asyncio.Task] = set()
+        
         # 自然语言描述缓存
         self._cached_scene_description = ""
         self._description_cache_timestamp: Optional[datetime] = None
         self._cache_ttl_seconds = 5.0  # 缓存5秒
         
+        # 环境状态中的静态部分，初始化完成后构建一次
+        self._static_status: Optional[Dict[str, Any]] = None
+        
         # 日志
-        self.logger = logging.getLogger(f"async_task_env.{self.config.env_id}")
+        self.logger = logging.LoggerAdapter(_BASE_LOGGER, {"env_id": self.config.env_id})
         
         self.logger.info(f"异步任务环境 {self.config.env_id} 已创建")
     
@@ -125,6 +134,7 @@ class AsyncTaskEnvironment:
                 
                 self.is_initialized = True
                 self.is_running = True
+                self._static_status = self._build_static_status()
                 
                 # 发布环境初始化完成事件
                 await self._publish_system_event_async(
@@ -158,6 +168,10 @@ class AsyncTaskEnvironment:
                 f"异步任务环境 {self.config.env_id} 正在关闭"
             )
             
+            # 等待后台发布的事件投递完成
+            if self._pending_publishes:
+                await asyncio.gather(*self._pending_publishes, return_exceptions=True)
+            
             # 停止场景监控器
             if self.scene_monitor:
                 await self.scene_monitor.stop_async()
@@ -173,6 +187,7 @@ class AsyncTaskEnvironment:
                 await stop_global_event_bus()
             
             self.is_running = False
+            self._static_status = None
             
             self.logger.info(f"异步任务环境 {self.config.env_id} 关闭完成")
             
@@ -676,6 +691,8 @@ class AsyncTaskEnvironment:
                     "failed": 0,
                     "details": []
                 }
+                # 成功添加的实体变更，在主循环中一次构建
+                entity_changes: List[Dict[str, Any]] = []
                 
                 for entity_data in entities:
                     entity_type = entity_data.get("type")
@@ -695,6 +712,12 @@ class AsyncTaskEnvironment:
                         
                         if success:
                             results["successful"] += 1
+                            entity_changes.append({
+                                "entity_id": entity_id,
+                                "entity_type": entity_type,
+                                "action": "added",
+                                "success": True
+                            })
                         else:
                             results["failed"] += 1
                         
@@ -720,20 +743,14 @@ class AsyncTaskEnvironment:
                     batch_event = SceneBatchEvent(
                         operation_id=str(uuid.uuid4()),
                         operation_type="batch_add",
-                        entity_changes=[
-                            {
-                                "entity_id": detail["entity_id"],
-                                "entity_type": detail["entity_type"],
-                                "action": "added",
-                                "success": detail["success"]
-                            }
-                            for detail in results["details"]
-                            if detail["success"]
-                        ],
+                        entity_changes=entity_changes,
                         summary=f"批量添加了 {results['successful']} 个实体",
                         source=f"async_task_env.{self.config.env_id}"
                     )
-                    await publish_event(batch_event)
+                    # 调用方只关心返回结果，事件投递放到后台执行
+                    publish_task = asyncio.create_task(publish_event(batch_event))
+                    self._pending_publishes.add(publish_task)
+                    publish_task.add_done_callback(self._pending_publishes.discard)
                 
                 if results["failed"] > 0:
                     results["success"] = False
@@ -752,16 +769,14 @@ class AsyncTaskEnvironment:
     
     # ==================== 状态查询API ====================
     
-    def get_environment_status(self) -> Dict[str, Any]:
-        """获取环境状态
+    def _build_static_status(self) -> Dict[str, Any]:
+        """构建环境状态中不随运行变化的部分
         
         Returns:
-            环境状态字典
+            包含env_id、配置和组件可用性的字典
         """
         return {
             "env_id": self.config.env_id,
-            "is_initialized": self.is_initialized,
-            "is_running": self.is_running,
             "config": {
                 "enable_monitoring": self.config.enable_monitoring,
                 "enable_natural_language": self.config.enable_natural_language,
@@ -772,7 +787,25 @@ class AsyncTaskEnvironment:
                 "task_context": self.task_context is not None,
                 "scene_monitor": self.scene_monitor is not None,
                 "event_bus": self.event_bus is not None
-            },
+            }
+        }
+    
+    def get_environment_status(self) -> Dict[str, Any]:
+        """获取环境状态
+        
+        静态部分在初始化完成时缓存，每次调用只重建易变字段；嵌套字典返回副本，
+        调用方修改返回值不会影响缓存。
+        
+        Returns:
+            环境状态字典
+        """
+        static_status = self._static_status or self._build_static_status()
+        return {
+            "env_id": static_status["env_id"],
+            "config": dict(static_status["config"]),
+            "components": dict(static_status["components"]),
+            "is_initialized": self.is_initialized,
+            "is_running": self.is_running,
             "subscriptions_count": len(self._event_subscriptions),
             "cache_status": {
                 "has_cached_description": bool(self._cached_scene_description),
@@ -6,8 +6,13 @@
 """
 
 import asyncio
+import functools
 import logging
-from typing import Any, Dict, List, Optional, Set, Callable
+import sys
+import threading
+from contextlib import contextmanager
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Set, Callable
 from dataclasses import dataclass, field
 
 from modules.entity.robot.robot import Robot
@@ -21,6 +26,27 @@ from modules.utils.global_config import GlobalConfig, RobotStatus, EntityType, E
 
 logger = logging.getLogger(__name__)
 
+# 每次技能提交和状态更新都会调用的校验函数，缓存其结果
+_validate_skill_name = functools.lru_cache(maxsize=256)(GlobalConfig.validate_skill_name)
+_validate_robot_status = functools.lru_cache(maxsize=64)(GlobalConfig.validate_robot_status)
+_validate_entity_type = functools.lru_cache(maxsize=256)(GlobalConfig.validate_entity_type)
+
+# 频繁使用的机器人状态取值
+_BUSY = RobotStatus.BUSY.value
+_IDLE = RobotStatus.IDLE.value
+
+# BUSY/IDLE切换时传给同步回调的预构建更新（只读视图，回调无法修改共享对象）
+_STATUS_BUSY_DICT = MappingProxyType({'status': _BUSY})
+_STATUS_IDLE_DICT = MappingProxyType({'status': _IDLE})
+
+def _intern(value: Any) -> Any:
+    """驻留字符串以加快后续的字典查找与比较；非字符串（如配置中的 null）原样返回"""
+    return sys.intern(value) if type(value) is str else value
+
+
+# 直接写入机器人实体状态的字段
+_ROBOT_STATE_KEYS = ('position', 'battery', 'status')
+
 
 class IntegratedRobotManager:
     """集成现有机器人系统的管理器"""
@@ -38,6 +64,13 @@ class IntegratedRobotManager:
         
         # 状态同步回调
         self.state_sync_callbacks: List[Callable[[Any, Dict[str, Any]], None]] = []
+        
+        # 待同步到TaskContext的状态更新，按机器人合并后批量刷新；
+        # 技能逻辑在线程池中执行，合并与交换需要加锁
+        self._pending_context_updates: Dict[Any, Dict[str, Any]] = {}
+        self._pending_lock = threading.Lock()
+        # 大于0时处于批量区间（如技能执行器的一个tick），由区间结束时统一刷新
+        self._batch_depth = 0
     
     def add_state_sync_callback(self, callback: Callable[[Any, Dict[str, Any]], None]):
         """添加状态同步回调"""
@@ -49,23 +82,35 @@ class IntegratedRobotManager:
         scene_config = environment.get('scene_config', {})
         nodes = scene_config.get('nodes', [])
         
+        # 先完成轻量的类型校验，再并发创建机器人
+        robot_specs = []
         for node in nodes:
             properties = node.get('properties', {})
             if properties.get('category') == EntityCategory.ROBOT.value:
                 robot_id = node.get('id')
-                robot_type = properties.get('type', 'unknown')
+                robot_type = _intern(properties.get('type', 'unknown'))
                 robot_label = properties.get('label', str(robot_id))
                 
-                # 验证机器人类型
-                if not GlobalConfig.validate_entity_type(robot_type):
+                # 验证机器人类型（非字符串类型无法通过校验，也不能作为缓存键）
+                if type(robot_type) is not str or not _validate_entity_type(robot_type):
                     logger.warning(f"无效的机器人类型: {robot_type}")
                     continue
                 
-                # 创建集成机器人
-                robot = await self._create_integrated_robot(robot_id, robot_type, robot_label, properties, node)
-                if robot:
-                    self.robots[robot_id] = robot
-                    logger.info(f"初始化集成机器人: {robot_label} ({robot_type})")
+                robot_specs.append((robot_id, robot_type, robot_label, properties, node))
+        
+        # 创建集成机器人
+        results = await asyncio.gather(
+            *(self._create_integrated_robot(*spec) for spec in robot_specs),
+            return_exceptions=True
+        )
+        
+        for (robot_id, robot_type, robot_label, _, _), robot in zip(robot_specs, results):
+            if isinstance(robot, Exception):
+                logger.error(f"创建集成机器人失败: {robot}")
+                continue
+            if robot:
+                self.robots[robot_id] = robot
+                logger.info("初始化集成机器人: %s (%s)", robot_label, robot_type)
     
     async def _create_integrated_robot(self, robot_id: Any, robot_type: str, robot_label: str, 
                                      properties: Dict[str, Any], node: Dict[str, Any]) -> Optional[Robot]:
@@ -82,7 +127,7 @@ class IntegratedRobotManager:
             position = self._extract_position_from_node(node)
             
             # 获取模板中的默认状态
-            template_status = robot_template.get('status', RobotStatus.IDLE.value)
+            template_status = robot_template.get('status', _IDLE)
             
             # 准备机器人配置
             robot_config = {
@@ -103,14 +148,16 @@ class IntegratedRobotManager:
             skills_list = robot_template.get('skills', [])
             for skill_name in skills_list:
                 try:
+                    skill_name = _intern(skill_name)
+                    
                     # 验证技能名称
-                    if not GlobalConfig.validate_skill_name(skill_name):
+                    if not _validate_skill_name(skill_name):
                         logger.warning(f"无效的技能名称: {skill_name}")
                         continue
                         
                     skill_instance = SkillFactory.create_skill(skill_name)
                     robot.add_skill(skill_name, skill_instance)
-                    logger.debug(f"为机器人 {robot_label} 添加技能: {skill_name}")
+                    logger.debug("为机器人 %s 添加技能: %s", robot_label, skill_name)
                 except Exception as e:
                     logger.warning(f"为机器人 {robot_label} 添加技能 {skill_name} 失败: {e}")
             
@@ -137,8 +184,12 @@ class IntegratedRobotManager:
         """获取机器人"""
         return self.robots.get(robot_id)
     
-    def get_all_robots(self) -> Dict[Any, Robot]:
-        """获取所有机器人"""
+    def get_all_robots(self) -> Mapping[Any, Robot]:
+        """获取所有机器人（只读视图）"""
+        return MappingProxyType(self.robots)
+    
+    def snapshot_robots(self) -> Dict[Any, Robot]:
+        """获取所有机器人的可修改副本"""
         return self.robots.copy()
     
     async def update_robot_state(self, robot_id: Any, updates: Dict[str, Any]):
@@ -150,20 +201,15 @@ class IntegratedRobotManager:
         # 验证状态更新
         if 'status' in updates:
             status = updates['status']
-            if not GlobalConfig.validate_robot_status(status):
+            if not _validate_robot_status(status):
                 logger.warning(f"无效的机器人状态: {status}")
                 return
         
         # 更新机器人状态
-        if 'position' in updates:
-            robot.set_state('position', updates['position'])
-        if 'battery' in updates:
-            robot.set_state('battery', updates['battery'])
-        if 'status' in updates:
-            robot.set_state('status', updates['status'])
+        robot.set_states({key: updates[key] for key in _ROBOT_STATE_KEYS if key in updates})
         
-        # 同步到TaskContext
-        self.task_context.update_object_properties(robot_id, updates)
+        # 合并到待同步更新；不在批量区间内时立即写入TaskContext
+        self._queue_context_update(robot_id, updates)
         
         # 触发状态同步回调
         for callback in self.state_sync_callbacks:
@@ -172,31 +218,64 @@ class IntegratedRobotManager:
             except Exception as e:
                 logger.error(f"状态同步回调执行错误: {e}")
     
-    async def add_skill_to_robot(self, robot_id: Any, skill_id: str):
-        """为机器人添加技能（标记为正在执行）"""
-        robot = self.robots.get(robot_id)
-        if not robot:
-            return
+    def _queue_context_update(self, robot_id: Any, updates: Dict[str, Any]):
+        """合并一条待同步的状态更新，不在批量区间内时立即刷新"""
+        with self._pending_lock:
+            pending = self._pending_context_updates.get(robot_id)
+            if pending is None:
+                self._pending_context_updates[robot_id] = dict(updates)
+            else:
+                pending.update(updates)
         
-        # 设置机器人状态为忙碌
-        robot.set_state('status', RobotStatus.BUSY.value)
+        if self._batch_depth == 0:
+            self.flush_context_updates()
+    
+    @contextmanager
+    def batch_context_updates(self):
+        """在区间内合并TaskContext写入，区间结束时一次性刷新（可嵌套）"""
+        self._batch_depth += 1
+        try:
+            yield
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self.flush_context_updates()
+    
+    def flush_context_updates(self):
+        """将合并后的机器人状态更新批量同步到TaskContext"""
+        with self._pending_lock:
+            if not self._pending_context_updates:
+                return
+            pending_updates = self._pending_context_updates
+            self._pending_context_updates = {}
         
-        await self.update_robot_state(robot_id, {
-            'status': RobotStatus.BUSY.value
-        })
+        for robot_id, updates in pending_updates.items():
+            self.task_context.update_object_properties(robot_id, updates)
     
-    async def remove_skill_from_robot(self, robot_id: Any, skill_id: str):
-        """从机器人移除技能（标记为完成）"""
+    def _set_robot_status_fast(self, robot_id: Any, status_updates: Mapping[str, Any]):
+        """BUSY/IDLE状态切换的快速路径，跳过通用的校验与字段过滤"""
         robot = self.robots.get(robot_id)
         if not robot:
             return
         
-        # 设置机器人状态为空闲
-        robot.set_state('status', RobotStatus.IDLE.value)
+        status = status_updates['status']
+        robot.set_state('status', status)
+        
+        self._queue_context_update(robot_id, {'status': status})
         
-        await self.update_robot_state(robot_id, {
-            'status': RobotStatus.IDLE.value
-        })
+        for callback in self.state_sync_callbacks:
+            try:
+                callback(robot_id, status_updates)
+            except Exception as e:
+                logger.error(f"状态同步回调执行错误: {e}")
+    
+    async def add_skill_to_robot(self, robot_id: Any, skill_id: str):
+        """为机器人添加技能（标记为正在执行）"""
+        self._set_robot_status_fast(robot_id, _STATUS_BUSY_DICT)
+    
+    async def remove_skill_from_robot(self, robot_id: Any, skill_id: str):
+        """从机器人移除技能（标记为完成）"""
+        self._set_robot_status_fast(robot_id, _STATUS_IDLE_DICT)
     
     async def get_robot_status(self, robot_id: Any) -> Optional[Dict[str, Any]]:
         """获取机器人状态"""
@@ -219,7 +298,7 @@ class IntegratedRobotManager:
         """重置所有机器人状态"""
         for robot in self.robots.values():
             robot.set_state('battery', 100.0)
-            robot.set_state('status', RobotStatus.IDLE.value)
+            robot.set_state('status', _IDLE)
             robot.set_state('position', {'x': 0, 'y': 0})
         
         logger.info("所有集成机器人状态已重置")
@@ -228,6 +307,10 @@ class IntegratedRobotManager:
         """处理TaskContext事件"""
         event_type = event.get("type")
         
+        # 非机器人对象的更新/移除事件无需处理，提前返回
+        if event_type != "OBJECT_ADDED" and event.get("object_id") not in self.robots:
+            return
+        
         if event_type == "OBJECT_ADDED":
             self._handle_object_added(event)
         elif event_type == "OBJECT_UPDATED":
@@ -242,7 +325,7 @@ class IntegratedRobotManager:
         
         properties = data.get("properties", {})
         if properties.get("category") == EntityCategory.ROBOT.value:
-            logger.info(f"检测到新机器人: {object_id}")
+            logger.info("检测到新机器人: %s", object_id)
     
     def _handle_object_updated(self, event: Dict[str, Any]):
         """处理对象更新事件"""
@@ -250,8 +333,8 @@ class IntegratedRobotManager:
         data = event.get("data", {})
         
         # 如果是机器人，同步状态
-        if object_id in self.robots:
-            robot = self.robots[object_id]
+        robot = self.robots.get(object_id)
+        if robot is not None:
             if 'position' in data:
                 robot.set_state('position', data['position'])
             if 'battery' in data:
@@ -259,7 +342,7 @@ class IntegratedRobotManager:
             if 'status' in data:
                 # 验证状态
                 status = data['status']
-                if GlobalConfig.validate_robot_status(status):
+                if _validate_robot_status(status):
                     robot.set_state('status', status)
                 else:
                     logger.warning(f"收到无效的机器人状态: {status}")
@@ -269,7 +352,7 @@ class IntegratedRobotManager:
         object_id = event.get("object_id")
         if object_id in self.robots:
             del self.robots[object_id]
-            logger.info(f"机器人已移除: {object_id}")
+            logger.info("机器人已移除: %s", object_id)
 
 
 # 导出类
@@ -6,8 +6,13 @@
 """
 
 import asyncio
+import functools
+import heapq
 import logging
-from typing import Any, Dict, List, Optional, Callable
+import math
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Callable, Set, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 from collections import defaultdict
@@ -18,6 +23,22 @@ from modules.utils.global_config import GlobalConfig, SkillNameMapping
 
 logger = logging.getLogger(__name__)
 
+# 技能名称映射与校验都是纯函数，缓存结果避免在提交/完成路径上重复计算
+_map_skill_name = functools.lru_cache(maxsize=256)(SkillNameMapping.map_scene_to_actual)
+_validate_skill_name = functools.lru_cache(maxsize=256)(GlobalConfig.validate_skill_name)
+
+# 固定持续时间的技能（秒），未列出的技能使用基础持续时间
+_DEFAULT_SKILL_DURATION = 2.0
+_SKILL_DURATIONS: Dict[str, float] = {
+    "take_photo": 1.0,
+    "load_object": 3.0,
+    "unload_object": 3.0,
+    "take_off": 2.0,
+    "land": 2.0,
+    "search_for_target": 4.0,
+    "identify_anomaly": 4.0,
+}
+
 
 class SkillStatus(Enum):
     """技能状态枚举"""
@@ -28,7 +49,7 @@ class SkillStatus(Enum):
     CANCELLED = "cancelled"
 
 
-@dataclass
+@dataclass(slots=True)
 class SkillExecution:
     """技能执行状态"""
     skill_id: str
@@ -42,6 +63,13 @@ class SkillExecution:
     result: Optional[Dict[str, Any]] = None
     error_message: Optional[str] = None
     progress: float = 0.0  # 执行进度 0.0-1.0
+    actual_skill_name: Optional[str] = None  # 映射后的实际技能名称
+    bound_skill: Optional[Skill] = None  # 提交时解析的技能实例
+
+
+# 热循环中使用的状态常量，避免重复的枚举属性查找
+_PENDING = SkillStatus.PENDING
+_RUNNING = SkillStatus.RUNNING
 
 
 class SkillExecutor:
@@ -64,25 +92,48 @@ class SkillExecutor:
         self.active_skills: Dict[str, SkillExecution] = {}
         self.skill_counter = 0
         
-        # 回调系统
-        self.skill_callbacks: Dict[str, List[Callable]] = defaultdict(list)
+        # 按时间排序的调度堆：(start_time, skill_id) / (end_time, skill_id)
+        # 每个tick只处理到期的技能，无需扫描全部活动技能
+        self._pending_heap: List[Tuple[float, str]] = []
+        self._running_heap: List[Tuple[float, str]] = []
+        
+        # 回调系统：(skill_id, event_type) -> {callback: (是否为协程函数, callback)}
+        # 以回调本身为键：绑定方法每次取属性都会生成新对象，但相等性和哈希是稳定的
+        self.skill_callbacks: Dict[Tuple[str, str], Dict[Callable, Tuple[bool, Callable]]] = defaultdict(dict)
+        
+        # 后台进行中的技能结果处理任务
+        self._completion_tasks: Set[asyncio.Task] = set()
+        
+        # 执行技能逻辑的线程池，避免同步技能实现阻塞事件循环
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
         
         # 执行状态
         self.is_running = False
     
     def register_skill_callback(self, skill_id: str, event_type: str, callback: Callable):
         """注册技能回调"""
-        key = f"{skill_id}_{event_type}"
-        self.skill_callbacks[key].append(callback)
+        self.skill_callbacks[(skill_id, event_type)][callback] = (
+            asyncio.iscoroutinefunction(callback), callback
+        )
     
     def unregister_skill_callback(self, skill_id: str, event_type: str, callback: Callable):
         """注销技能回调"""
-        key = f"{skill_id}_{event_type}"
-        if key in self.skill_callbacks and callback in self.skill_callbacks[key]:
-            self.skill_callbacks[key].remove(callback)
+        key = (skill_id, event_type)
+        callbacks = self.skill_callbacks.get(key)
+        if callbacks is None:
+            return
+        callbacks.pop(callback, None)
+        if not callbacks:
+            del self.skill_callbacks[key]
     
     async def start(self):
         """启动技能执行器"""
+        if self._thread_pool is None:
+            fleet_size = len(self.robot_manager.get_all_robots())
+            self._thread_pool = ThreadPoolExecutor(
+                max_workers=max(1, min(32, fleet_size)),
+                thread_name_prefix="skill_executor"
+            )
         self.is_running = True
         asyncio.create_task(self._skill_execution_loop())
         logger.info("集成技能执行器已启动")
@@ -90,6 +141,17 @@ class SkillExecutor:
     async def stop(self):
         """停止技能执行器"""
         self.is_running = False
+        
+        # 等待后台的技能结果处理完成
+        if self._completion_tasks:
+            await asyncio.gather(*self._completion_tasks, return_exceptions=True)
+        
+        self.robot_manager.flush_context_updates()
+        
+        if self._thread_pool is not None:
+            self._thread_pool.shutdown(wait=False)
+            self._thread_pool = None
+        
         logger.info("集成技能执行器已停止")
     
     async def execute_skill(self, robot_id: Any, skill_name: str, 
@@ -108,7 +170,7 @@ class SkillExecutor:
         skill_params = skill_params or {}
         
         # 验证技能名称
-        if not GlobalConfig.validate_skill_name(skill_name):
+        if not _validate_skill_name(skill_name):
             raise ValueError(f"无效的技能名称: {skill_name}")
         
         # 生成技能ID
@@ -123,6 +185,10 @@ class SkillExecutor:
         duration = await self._calculate_skill_duration(robot_id, skill_name, skill_params)
         current_time = self.time_manager.get_sim_time()
         
+        # 验证通过后解析一次技能实例，完成时直接调用
+        actual_skill_name = _map_skill_name(skill_name)
+        bound_skill = self.robot_manager.get_robot(robot_id).skills[actual_skill_name]
+        
         # 创建技能执行记录
         execution = SkillExecution(
             skill_id=skill_id,
@@ -131,17 +197,20 @@ class SkillExecutor:
             start_time=current_time,
             end_time=current_time + duration,
             duration=duration,
-            status=SkillStatus.PENDING,
-            params=skill_params
+            status=_PENDING,
+            params=skill_params,
+            actual_skill_name=actual_skill_name,
+            bound_skill=bound_skill
         )
         
         # 添加到活动技能
         self.active_skills[skill_id] = execution
+        heapq.heappush(self._pending_heap, (execution.start_time, skill_id))
         
         # 触发技能开始回调
         await self._trigger_skill_callbacks(skill_id, "started", execution)
         
-        logger.info(f"技能已提交: {skill_id} ({robot_id} -> {skill_name}), 持续时间: {duration:.2f}s")
+        logger.info("技能已提交: %s (%s -> %s), 持续时间: %.2fs", skill_id, robot_id, skill_name, duration)
         return skill_id
     
     async def cancel_skill(self, skill_id: str) -> bool:
@@ -158,7 +227,7 @@ class SkillExecutor:
         # 触发技能取消回调
         await self._trigger_skill_callbacks(skill_id, "cancelled", execution)
         
-        logger.info(f"技能已取消: {skill_id}")
+        logger.info("技能已取消: %s", skill_id)
         return True
     
     async def get_skill_status(self, skill_id: str) -> Optional[SkillStatus]:
@@ -172,9 +241,9 @@ class SkillExecutor:
         if not execution:
             return None
         
-        if execution.status == SkillStatus.COMPLETED:
+        if execution.status is SkillStatus.COMPLETED:
             return 1.0
-        elif execution.status == SkillStatus.RUNNING:
+        elif execution.status is _RUNNING:
             current_time = self.time_manager.get_sim_time()
             elapsed = current_time - execution.start_time
             return min(elapsed / execution.duration, 1.0)
@@ -189,12 +258,12 @@ class SkillExecutor:
             return False
         
         # 使用全局配置验证技能名称
-        if not GlobalConfig.validate_skill_name(skill_name):
+        if not _validate_skill_name(skill_name):
             logger.warning(f"无效的技能名称: {skill_name}")
             return False
         
         # 检查技能是否存在（使用映射后的名称）
-        actual_skill_name = SkillNameMapping.map_scene_to_actual(skill_name)
+        actual_skill_name = _map_skill_name(skill_name)
         if actual_skill_name not in robot.skills:
             logger.warning(f"机器人 {robot_id} 不支持技能: {skill_name} (映射后: {actual_skill_name})")
             return False
@@ -209,62 +278,62 @@ class SkillExecutor:
     async def _calculate_skill_duration(self, robot_id: Any, skill_name: str, 
                                       skill_params: Dict[str, Any]) -> float:
         """计算技能持续时间"""
-        # 基础持续时间
-        base_duration = 2.0
-        
         # 使用全局配置进行技能名称映射
-        actual_skill_name = SkillNameMapping.map_scene_to_actual(skill_name)
+        actual_skill_name = _map_skill_name(skill_name)
         
-        # 根据技能类型调整
         if actual_skill_name == "navigate":
-            # 导航时间基于距离
+            # 导航时间基于距离，5m/s速度，最少1秒
             robot = self.robot_manager.get_robot(robot_id)
             if robot and 'target_position' in skill_params:
                 current_pos = robot.get_state('position', {'x': 0, 'y': 0})
                 target_pos = skill_params['target_position']
-                distance = ((target_pos[0] - current_pos['x']) ** 2 + 
-                           (target_pos[1] - current_pos['y']) ** 2) ** 0.5
-                base_duration = max(1.0, distance / 5.0)  # 5m/s速度
-        
-        elif actual_skill_name == "take_photo":
-            base_duration = 1.0
-        
-        elif actual_skill_name == "load_object":
-            base_duration = 3.0
-        
-        elif actual_skill_name == "unload_object":
-            base_duration = 3.0
-        
-        elif actual_skill_name in ["take_off", "land"]:
-            base_duration = 2.0
-        
-        elif actual_skill_name in ["search_for_target", "identify_anomaly"]:
-            base_duration = 4.0
-        
-        return base_duration
+                dx = target_pos[0] - current_pos['x']
+                dy = target_pos[1] - current_pos['y']
+                dist_sq = dx * dx + dy * dy
+                # 距离小于5m时无需开方
+                return 1.0 if dist_sq < 25.0 else math.sqrt(dist_sq) * 0.2
+            return _DEFAULT_SKILL_DURATION
+        
+        return _SKILL_DURATIONS.get(actual_skill_name, _DEFAULT_SKILL_DURATION)
     
     async def _skill_execution_loop(self):
         """技能执行循环"""
         while self.is_running:
             try:
-                await self._process_pending_skills()
-                await self._update_running_skills()
-                await self._cleanup_completed_skills()
+                await self._tick(self.time_manager.get_sim_time())
                 await asyncio.sleep(0.1)  # 100ms执行间隔
             except Exception as e:
                 logger.error(f"技能执行循环错误: {e}")
                 await asyncio.sleep(1)
     
-    async def _process_pending_skills(self):
-        """处理待执行的技能"""
-        current_time = self.time_manager.get_sim_time()
-        pending_skills = [
-            skill for skill in self.active_skills.values()
-            if skill.status == SkillStatus.PENDING and current_time >= skill.start_time
-        ]
+    async def _tick(self, current_time: float):
+        """单次调度：启动到期的待执行技能，并完成到期的运行中技能
+        
+        模拟时间每个tick只读取一次；进度在get_skill_progress中按需计算。
         
-        for skill in pending_skills:
-            await self._start_skill_execution(skill)
+        Args:
+            current_time: 当前模拟时间
+        """
+        active_skills = self.active_skills
+        pending_heap = self._pending_heap
+        running_heap = self._running_heap
+        
+        # 本tick内的机器人状态变化在区间结束时一次性同步到TaskContext
+        with self.robot_manager.batch_context_updates():
+            while pending_heap and pending_heap[0][0] <= current_time:
+                _, skill_id = heapq.heappop(pending_heap)
+                skill = active_skills.get(skill_id)
+                # 已取消或已被重置的技能直接丢弃
+                if skill is None or skill.status is not _PENDING:
+                    continue
+                await self._start_skill_execution(skill)
+            
+            while running_heap and running_heap[0][0] <= current_time:
+                _, skill_id = heapq.heappop(running_heap)
+                skill = active_skills.get(skill_id)
+                if skill is None or skill.status is not _RUNNING:
+                    continue
+                await self._complete_skill(skill)
     
     async def _start_skill_execution(self, skill: SkillExecution):
         """开始技能执行"""
@@ -278,46 +347,45 @@ class SkillExecutor:
         await self.robot_manager.add_skill_to_robot(skill.robot_id, skill.skill_id)
         
         # 更新技能状态
-        skill.status = SkillStatus.RUNNING
+        skill.status = _RUNNING
+        heapq.heappush(self._running_heap, (skill.end_time, skill.skill_id))
         
-        logger.info(f"开始执行技能: {skill.skill_id}")
-    
-    async def _update_running_skills(self):
-        """更新运行中的技能"""
-        current_time = self.time_manager.get_sim_time()
-        
-        for skill in self.active_skills.values():
-            if skill.status != SkillStatus.RUNNING:
-                continue
-            
-            # 更新进度
-            elapsed = current_time - skill.start_time
-            skill.progress = min(elapsed / skill.duration, 1.0)
-            
-            # 检查是否完成
-            if current_time >= skill.end_time:
-                await self._complete_skill(skill)
+        logger.info("开始执行技能: %s", skill.skill_id)
     
     async def _complete_skill(self, skill: SkillExecution):
-        """完成技能执行"""
-        # 从机器人移除技能
-        await self.robot_manager.remove_skill_from_robot(skill.robot_id, skill.skill_id)
-        
-        # 执行技能逻辑并获取结果
-        skill_result = await self._execute_skill_logic(skill)
+        """完成技能执行
         
+        技能逻辑、结果处理和完成回调在后台任务中进行，不阻塞调度循环；
+        机器人在技能效果应用之前保持BUSY，不会提前接受下一个技能。
+        """
         # 更新技能状态
         skill.status = SkillStatus.COMPLETED
         skill.progress = 1.0
-        skill.result = skill_result
         
-        # 处理技能执行结果，更新TaskContext
-        await self._handle_skill_result(skill)
-        
-        # 触发技能完成回调
-        await self._trigger_skill_callbacks(skill.skill_id, "completed", skill)
-        
-        logger.info(f"技能执行完成: {skill.skill_id}")
+        completion_task = asyncio.create_task(self._post_complete(skill))
+        self._completion_tasks.add(completion_task)
+        completion_task.add_done_callback(self._completion_tasks.discard)
+    
+    async def _post_complete(self, skill: SkillExecution):
+        """执行技能逻辑、处理结果、释放机器人并触发完成回调"""
+        try:
+            try:
+                # 执行技能逻辑并获取结果
+                skill.result = await self._execute_skill_logic(skill)
+                
+                # 处理技能执行结果，更新TaskContext
+                await self._handle_skill_result(skill)
+            finally:
+                # 技能效果应用后（或处理失败时）才从机器人移除技能
+                await self.robot_manager.remove_skill_from_robot(skill.robot_id, skill.skill_id)
+            
+            # 触发技能完成回调
+            await self._trigger_skill_callbacks(skill.skill_id, "completed", skill)
+            
+            logger.info("技能执行完成: %s", skill.skill_id)
+            
+        except Exception as e:
+            logger.error(f"技能完成处理失败: {e}")
     
     async def _execute_skill_logic(self, skill: SkillExecution) -> Dict[str, Any]:
         """执行技能逻辑 - 使用现有的技能系统"""
@@ -326,20 +394,14 @@ class SkillExecutor:
             return {'success': False, 'error': 'Robot not found'}
         
         try:
-            # 使用全局配置进行技能名称映射
-            actual_skill_name = SkillNameMapping.map_scene_to_actual(skill.skill_name)
-            
-            # 检查技能是否存在
-            if actual_skill_name not in robot.skills:
-                return {'success': False, 'error': f'Skill {skill.skill_name} (映射后: {actual_skill_name}) not found'}
+            # 使用提交时绑定的技能实例执行
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(
+                self._thread_pool,
+                functools.partial(skill.bound_skill.execute_with_logging, robot, **skill.params)
+            )
             
-            # 获取技能实例
-            skill_instance = robot.skills[actual_skill_name]
-            
-            # 使用现有技能系统的执行方法
-            result = skill_instance.execute_with_logging(robot, **skill.params)
-            
-            logger.info(f"技能 {skill.skill_name} (映射后: {actual_skill_name}) 执行完成，结果: {result}")
+            logger.info("技能 %s (映射后: %s) 执行完成，结果: %s", skill.skill_name, skill.actual_skill_name, result)
             return result
             
         except Exception as e:
@@ -384,37 +446,44 @@ class SkillExecutor:
                 for obj_id, updates in execution_result['object_updates'].items():
                     self.task_context.update_object_properties(obj_id, updates)
             
-            logger.debug(f"技能结果已处理: {skill.skill_id}")
+            logger.debug("技能结果已处理: %s", skill.skill_id)
             
         except Exception as e:
             logger.error(f"处理技能结果失败: {e}")
     
-    async def _cleanup_completed_skills(self):
-        """清理已完成的技能"""
-        # 保留最近完成的技能用于查询，这里可以设置保留时间
-        pass
-    
     async def _trigger_skill_callbacks(self, skill_id: str, event_type: str, skill: SkillExecution):
         """触发技能回调"""
-        key = f"{skill_id}_{event_type}"
-        callbacks = self.skill_callbacks[key]
+        # 使用get避免defaultdict在完成路径上插入空列表
+        callbacks = self.skill_callbacks.get((skill_id, event_type))
+        if not callbacks:
+            return
         
-        for callback in callbacks:
+        # 同步回调直接执行，异步回调并发执行
+        coroutines = []
+        for is_coroutine, callback in list(callbacks.values()):
+            if is_coroutine:
+                coroutines.append(callback(skill))
+                continue
             try:
-                if asyncio.iscoroutinefunction(callback):
-                    await callback(skill)
-                else:
-                    callback(skill)
+                callback(skill)
             except Exception as e:
                 logger.error(f"技能回调执行错误: {e}")
+        
+        if coroutines:
+            results = await asyncio.gather(*coroutines, return_exceptions=True)
+            for result in results:
+                if isinstance(result, Exception):
+                    logger.error(f"技能回调执行错误: {result}")
     
-    def get_active_skills(self) -> Dict[str, SkillExecution]:
-        """获取活动技能"""
-        return self.active_skills.copy()
+    def get_active_skills(self) -> Mapping[str, SkillExecution]:
+        """获取活动技能（只读视图）"""
+        return MappingProxyType(self.active_skills)
     
     def reset(self):
         """重置技能执行器"""
         self.active_skills.clear()
+        self._pending_heap.clear()
+        self._running_heap.clear()
 
 
 # 导出类
@@ -7,13 +7,17 @@
 import asyncio
 import time
 import logging
-from typing import Callable, List
+from typing import Callable, List, Optional
 
 logger = logging.getLogger(__name__)
 
 
 class TimeManager:
-    """时间管理器"""
+    """时间管理器
+    
+    模拟时间在读取时根据单调时钟按需计算，不依赖轮询循环；
+    仅当注册了时间更新回调时才启动周期性通知循环。
+    """
     
     def __init__(self, time_scale: float = 1.0):
         """
@@ -23,48 +27,70 @@ class TimeManager:
             time_scale: 时间倍率，1.0表示正常速度，2.0表示2倍速
         """
         self.time_scale = time_scale
-        self.sim_time = 0.0
-        self.real_start_time = time.time()
+        # 已累计的模拟时间；运行期间从real_start_time起按倍率继续累加
+        self._sim_time_offset = 0.0
+        self.real_start_time = time.monotonic()
         self.is_running = False
         
         # 时间更新回调
         self.time_update_callbacks: List[Callable[[float], None]] = []
+        self._update_task: Optional[asyncio.Task] = None
+    
+    @property
+    def sim_time(self) -> float:
+        """当前模拟时间"""
+        return self.get_sim_time()
     
     def get_sim_time(self) -> float:
         """获取当前模拟时间"""
-        return self.sim_time
+        if not self.is_running:
+            return self._sim_time_offset
+        return self._sim_time_offset + (time.monotonic() - self.real_start_time) * self.time_scale
     
     def set_time_scale(self, time_scale: float):
         """设置时间倍率"""
+        # 先按旧倍率结算已经过的模拟时间，保证时间连续
+        if self.is_running:
+            now = time.monotonic()
+            self._sim_time_offset += (now - self.real_start_time) * self.time_scale
+            self.real_start_time = now
         self.time_scale = time_scale
-        logger.info(f"时间倍率已设置为: {time_scale}")
+        logger.info("时间倍率已设置为: %s", time_scale)
     
     def add_time_update_callback(self, callback: Callable[[float], None]):
         """添加时间更新回调"""
         self.time_update_callbacks.append(callback)
+        if self.is_running:
+            self._ensure_update_loop()
     
     async def start(self):
         """启动时间管理器"""
+        self.real_start_time = time.monotonic()
         self.is_running = True
-        asyncio.create_task(self._time_update_loop())
-        logger.info(f"时间管理器已启动，时间倍率: {self.time_scale}")
+        if self.time_update_callbacks:
+            self._ensure_update_loop()
+        logger.info("时间管理器已启动，时间倍率: %s", self.time_scale)
     
     async def stop(self):
         """停止时间管理器"""
+        self._sim_time_offset = self.get_sim_time()
         self.is_running = False
         logger.info("时间管理器已停止")
     
+    def _ensure_update_loop(self):
+        """在需要通知回调时启动时间更新循环"""
+        if self._update_task is None or self._update_task.done():
+            self._update_task = asyncio.create_task(self._time_update_loop())
+    
     async def _time_update_loop(self):
-        """时间更新循环"""
+        """时间更新循环，仅用于向回调推送模拟时间"""
         while self.is_running:
             try:
-                # 更新模拟时间
-                real_time = time.time() - self.real_start_time
-                self.sim_time = real_time * self.time_scale
+                sim_time = self.get_sim_time()
                 
                 for callback in self.time_update_callbacks:
                     try:
-                        callback(self.sim_time)
+                        callback(sim_time)
                     except Exception as e:
                         logger.error(f"时间更新回调执行错误: {e}")
                 
@@ -75,6 +101,6 @@ class TimeManager:
     
     def reset(self):
         """重置时间"""
-        self.sim_time = 0.0
-        self.real_start_time = time.time()
-        logger.info("时间已重置") 
\ No newline at end of file
+        self._sim_time_offset = 0.0
+        self.real_start_time = time.monotonic()
+        logger.info("时间已重置")
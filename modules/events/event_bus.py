@@ -5,17 +5,37 @@
 """
 
 import asyncio
-from typing import Any, Callable, Dict, List, Optional, Type, Union
+import bisect
+from typing import (
+    Any, Callable, ClassVar, Dict, Hashable, Iterator, List, Mapping, NamedTuple, Optional, Set, Tuple, Type, Union
+)
 from dataclasses import dataclass, field
 from datetime import datetime
 from collections import defaultdict, deque
-import uuid
+import itertools
+import os
+import operator
+import random
+import time
 import logging
-from abc import ABC, abstractmethod
+from abc import ABC
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
 
 logger = logging.getLogger(__name__)
 
+# 单调时钟与墙上时钟的差值，用于按需把事件的单调时间戳换算为datetime
+_WALL_CLOCK_OFFSET_NS = time.time_ns() - time.monotonic_ns()
+
+# 进程内单调递增的ID生成器，以进程号为前缀，避免每个事件调用uuid4
+_id_counter = itertools.count(1)
+_id_prefix = f"{os.getpid():x}-"
+
+
+def _next_id() -> str:
+    """生成进程内唯一的事件/订阅ID"""
+    return _id_prefix + format(next(_id_counter), "x")
+
 # 全局事件总线实例
 _global_event_bus: Optional['EventBus'] = None
 
@@ -54,34 +74,51 @@ class EventType(Enum):
     SCENE_BATCH = "scene_batch"
 
 
-@dataclass
+@dataclass(slots=True, eq=False)
 class Event(ABC):
     """事件基类
     
-    所有事件都应该继承此基类，并实现event_type属性。
+    所有事件都应该继承此基类，并声明EVENT_TYPE类属性。
     
     Attributes:
         event_id: 事件唯一标识符
-        timestamp: 事件时间戳
+        timestamp_ns: 事件创建时的单调时钟时间戳（纳秒）
         source: 事件来源
     """
     
-    event_id: str = field(default_factory=lambda: str(uuid.uuid4()))
-    timestamp: datetime = field(default_factory=datetime.now)
+    event_id: str = field(default_factory=_next_id)
+    timestamp_ns: int = field(default_factory=time.monotonic_ns)
     source: Optional[str] = None
     
     @property
-    @abstractmethod
+    def timestamp(self) -> datetime:
+        """事件时间戳，仅在读取时换算为datetime
+        
+        Returns:
+            事件创建时的本地时间
+        """
+        return datetime.fromtimestamp((self.timestamp_ns + _WALL_CLOCK_OFFSET_NS) / 1e9)
+    
+    # 事件类型，由子类以类属性声明；热路径直接读取以避免属性调用
+    EVENT_TYPE: ClassVar[str]
+    
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super(Event, cls).__init_subclass__(**kwargs)
+        # 声明了EVENT_TYPE的子类直接以类属性覆盖event_type属性，读取时无需调用函数
+        if 'EVENT_TYPE' in cls.__dict__:
+            cls.event_type = cls.EVENT_TYPE
+    
+    @property
     def event_type(self) -> str:
         """事件类型
         
         Returns:
             事件类型字符串
         """
-        pass
+        return self.EVENT_TYPE
 
 
-@dataclass
+@dataclass(slots=True, eq=False)
 class SystemEvent(Event):
     """系统事件
     
@@ -95,12 +132,10 @@ class SystemEvent(Event):
     message: str = ""
     data: Dict[str, Any] = field(default_factory=dict)
     
-    @property
-    def event_type(self) -> str:
-        return EventType.SYSTEM.value
+    EVENT_TYPE: ClassVar[str] = EventType.SYSTEM.value
 
 
-@dataclass
+@dataclass(slots=True, eq=False)
 class TaskEvent(Event):
     """任务事件
     
@@ -116,12 +151,10 @@ class TaskEvent(Event):
     action: str = ""  # created, started, completed, failed, cancelled
     data: Dict[str, Any] = field(default_factory=dict)
     
-    @property
-    def event_type(self) -> str:
-        return EventType.TASK.value
+    EVENT_TYPE: ClassVar[str] = EventType.TASK.value
 
 
-@dataclass
+@dataclass(slots=True, eq=False)
 class RobotEvent(Event):
     """机器人事件
     
@@ -137,12 +170,10 @@ class RobotEvent(Event):
     action: str = ""  # status_changed, task_assigned, skill_executed
     data: Dict[str, Any] = field(default_factory=dict)
     
-    @property
-    def event_type(self) -> str:
-        return EventType.ROBOT.value
+    EVENT_TYPE: ClassVar[str] = EventType.ROBOT.value
 
 
-@dataclass
+@dataclass(slots=True, eq=False)
 class SkillEvent(Event):
     """技能事件
     
@@ -160,12 +191,10 @@ class SkillEvent(Event):
     action: str = ""  # started, completed, failed
     data: Dict[str, Any] = field(default_factory=dict)
     
-    @property
-    def event_type(self) -> str:
-        return EventType.SKILL.value
+    EVENT_TYPE: ClassVar[str] = EventType.SKILL.value
 
 
-@dataclass
+@dataclass(slots=True, eq=False)
 class ObjectEvent(Event):
     """对象事件
     
@@ -181,12 +210,10 @@ class ObjectEvent(Event):
     action: str = ""  # added, removed, updated
     data: Dict[str, Any] = field(default_factory=dict)
     
-    @property
-    def event_type(self) -> str:
-        return EventType.OBJECT.value
+    EVENT_TYPE: ClassVar[str] = EventType.OBJECT.value
 
 
-@dataclass
+@dataclass(slots=True, eq=False)
 class GoalEvent(Event):
     """目标事件
     
@@ -202,12 +229,10 @@ class GoalEvent(Event):
     action: str = ""  # updated, completed, removed
     data: Dict[str, Any] = field(default_factory=dict)
     
-    @property
-    def event_type(self) -> str:
-        return EventType.GOAL.value
+    EVENT_TYPE: ClassVar[str] = EventType.GOAL.value
 
 
-@dataclass
+@dataclass(slots=True, eq=False)
 class ConfigEvent(Event):
     """配置事件
     
@@ -227,12 +252,10 @@ class ConfigEvent(Event):
     new_value: Any = None
     data: Dict[str, Any] = field(default_factory=dict)
     
-    @property
-    def event_type(self) -> str:
-        return EventType.CONFIG.value
+    EVENT_TYPE: ClassVar[str] = EventType.CONFIG.value
 
 
-@dataclass
+@dataclass(slots=True, eq=False)
 class SceneEntityEvent(Event):
     """场景实体事件
     
@@ -258,12 +281,10 @@ class SceneEntityEvent(Event):
     position: Optional[Dict[str, Any]] = None
     metadata: Dict[str, Any] = field(default_factory=dict)
     
-    @property
-    def event_type(self) -> str:
-        return EventType.SCENE_ENTITY.value
+    EVENT_TYPE: ClassVar[str] = EventType.SCENE_ENTITY.value
 
 
-@dataclass
+@dataclass(slots=True, eq=False)
 class SceneBatchEvent(Event):
     """场景批量操作事件
     
@@ -281,12 +302,10 @@ class SceneBatchEvent(Event):
     entity_changes: List[Dict[str, Any]] = field(default_factory=list)
     summary: str = ""
     
-    @property
-    def event_type(self) -> str:
-        return EventType.SCENE_BATCH.value
+    EVENT_TYPE: ClassVar[str] = EventType.SCENE_BATCH.value
 
 
-@dataclass
+@dataclass(slots=True, eq=False)
 class MonitorEvent(Event):
     """监控事件
     
@@ -308,15 +327,38 @@ class MonitorEvent(Event):
     severity: str = "info"  # info, warning, error
     context: Dict[str, Any] = field(default_factory=dict)
     
-    @property
-    def event_type(self) -> str:
-        return EventType.MONITOR.value
+    EVENT_TYPE: ClassVar[str] = EventType.MONITOR.value
 
 
 # 事件处理器类型定义
 EventHandler = Callable[[Event], None]
 AsyncEventHandler = Callable[[Event], asyncio.Future]
 
+# 事件缺少过滤属性时使用的哨兵值
+_MISSING = object()
+
+# 事件队列满时的处理策略：阻塞等待队列腾出空间（默认）、丢弃新事件、丢弃最旧事件
+OVERFLOW_POLICIES = ("block", "drop-newest", "drop-oldest")
+
+
+def _priority_key(subscription: 'EventSubscription') -> int:
+    """订阅排序键：优先级高的排在前面"""
+    return -subscription.priority
+
+
+class FilterSpec(NamedTuple):
+    """声明式事件过滤条件
+    
+    要求事件的指定属性等于给定值，例如 FilterSpec({"robot_id": "r1"})。
+    与任意的filter_func不同，事件总线可以按属性值为此类订阅建立索引，
+    分发时只需查找匹配的订阅，而无需对每个订阅调用过滤函数。
+    
+    Attributes:
+        attr_equals: 属性名到期望值的映射
+    """
+    
+    attr_equals: Mapping[str, Hashable]
+
 
 class EventSubscription:
     """事件订阅
@@ -324,6 +366,13 @@ class EventSubscription:
     管理单个事件订阅的信息和处理逻辑。
     """
     
+    __slots__ = (
+        "event_type", "handler", "subscriber_id", "filter_func", "filter_spec",
+        "_spec_items", "priority", "max_retries", "retry_delay", "subscription_id",
+        "created_at", "call_count", "error_count", "last_called", "last_error",
+        "_is_coro", "_retry_delays", "_rest_checks"
+    )
+    
     def __init__(self, 
                  event_type: str,
                  handler: Union[EventHandler, AsyncEventHandler],
@@ -331,7 +380,8 @@ class EventSubscription:
                  filter_func: Optional[Callable[[Event], bool]] = None,
                  priority: int = 0,
                  max_retries: int = 0,
-                 retry_delay: float = 1.0):
+                 retry_delay: float = 1.0,
+                 filter_spec: Optional[FilterSpec] = None):
         """初始化事件订阅
         
         Args:
@@ -342,40 +392,61 @@ class EventSubscription:
             priority: 优先级（数字越大优先级越高）
             max_retries: 最大重试次数
             retry_delay: 重试延迟（秒）
+            filter_spec: 声明式属性过滤条件
         """
         self.event_type = event_type
         self.handler = handler
         self.subscriber_id = subscriber_id
         self.filter_func = filter_func
+        self.filter_spec = filter_spec
+        self._spec_items: Tuple[Tuple[str, Any], ...] = (
+            tuple(filter_spec.attr_equals.items()) if filter_spec else ()
+        )
+        # 第一个条件由事件总线的索引保证，其余条件预先编译为属性读取器
+        self._rest_checks: Tuple[Tuple[Callable[[Event], Any], Any], ...] = tuple(
+            (operator.attrgetter(attr), expected) for attr, expected in self._spec_items[1:]
+        )
         self.priority = priority
         self.max_retries = max_retries
         self.retry_delay = retry_delay
-        self.subscription_id = str(uuid.uuid4())
+        self.subscription_id = _next_id()
         self.created_at = datetime.now()
         self.call_count = 0
         self.error_count = 0
         self.last_called = None
         self.last_error = None
-    
-    async def handle_event(self, event: Event) -> None:
+        
+        # 处理器在订阅时已确定，提前判断是否为协程函数
+        self._is_coro = asyncio.iscoroutinefunction(handler)
+        
+        # 预先计算带随机抖动的指数退避延迟
+        self._retry_delays = [
+            retry_delay * (2 ** i) + random.uniform(0, 0.1)
+            for i in range(max_retries)
+        ]
+    
+    async def handle_event(self, 
+                           event: Event, 
+                           executor: Optional[ThreadPoolExecutor] = None) -> None:
         """处理事件（带重试机制）
         
         Args:
             event: 要处理的事件
+            executor: 运行同步处理器的线程池，为None时使用默认线程池
         """
         retries = 0
         
         while retries <= self.max_retries:
             try:
                 self.call_count += 1
-                self.last_called = datetime.now()
+                self.last_called = time.monotonic()
                 
-                if asyncio.iscoroutinefunction(self.handler):
+                if self._is_coro:
                     await self.handler(event)
                 else:
                     # 在线程池中运行同步处理器
-                    loop = asyncio.get_event_loop()
-                    await loop.run_in_executor(None, self.handler, event)
+                    loop = asyncio.get_running_loop()
+                    await loop.run_in_executor(executor, self.handler, event)
                 
                 # 成功处理，退出重试循环
                 break
@@ -389,7 +460,7 @@ class EventSubscription:
                     logger.warning(
                         f"Handler {self.subscription_id} failed (attempt {retries}/{self.max_retries + 1}): {e}"
                     )
-                    await asyncio.sleep(self.retry_delay * retries)  # 指数退避
+                    await asyncio.sleep(self._retry_delays[retries - 1])  # 指数退避
                 else:
                     logger.error(
                         f"Handler {self.subscription_id} failed after {self.max_retries + 1} attempts: {e}",
@@ -400,13 +471,39 @@ class EventSubscription:
     def matches(self, event: Event) -> bool:
         """检查事件是否匹配订阅
         
+        事件类型已由事件总线按类型分桶保证，这里只检查过滤函数。
+        
+        Args:
+            event: 要检查的事件
+            
+        Returns:
+            是否匹配
+        """
+        for attr, expected in self._spec_items:
+            if getattr(event, attr, _MISSING) != expected:
+                return False
+        
+        if self.filter_func and not self.filter_func(event):
+            return False
+        
+        return True
+    
+    def matches_indexed(self, event: Event) -> bool:
+        """检查经索引命中的事件是否匹配订阅
+        
+        索引已确认第一个过滤条件，这里只检查其余条件和过滤函数。
+        
         Args:
             event: 要检查的事件
             
         Returns:
             是否匹配
         """
-        if event.event_type != self.event_type:
+        try:
+            for getter, expected in self._rest_checks:
+                if getter(event) != expected:
+                    return False
+        except AttributeError:
             return False
         
         if self.filter_func and not self.filter_func(event):
@@ -421,25 +518,64 @@ class EventBus:
     提供异步事件发布和订阅机制，支持事件过滤、历史记录和统计信息。
     """
     
-    def __init__(self, max_queue_size: int = 1000, max_concurrent_handlers: int = 100):
+    def __init__(self, 
+                 max_queue_size: int = 1000, 
+                 max_concurrent_handlers: int = 100,
+                 max_history_size: int = 1000,
+                 batch_max: int = 32,
+                 overflow_policy: str = "block"):
         """初始化事件总线
         
         Args:
             max_queue_size: 事件队列最大大小
             max_concurrent_handlers: 最大并发处理器数量
+            max_history_size: 事件历史最大记录数，为0时不记录历史
+            batch_max: 处理循环每次最多取出的事件数量
+            overflow_policy: 队列满时的处理策略，取值见OVERFLOW_POLICIES；默认阻塞发布者以形成背压，
+                不丢失事件，需要时可选择丢弃策略
         """
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow_policy must be one of {OVERFLOW_POLICIES}, got {overflow_policy!r}")
+        if max_history_size < 0:
+            raise ValueError(f"max_history_size must be non-negative, got {max_history_size!r}")
+        
+        self.overflow_policy = overflow_policy
         self.max_queue_size = max_queue_size
+        self.batch_max = batch_max
         self.max_concurrent_handlers = max_concurrent_handlers
-        self.event_queue = asyncio.Queue(maxsize=max_queue_size)
-        self.subscriptions: Dict[str, List[EventSubscription]] = defaultdict(list)
-        self.event_history = deque(maxlen=1000)
+        # 单一消费者的事件队列：deque存放待处理事件，Event在队列非空时唤醒处理循环
+        self._queue: deque = deque()
+        self._not_empty = asyncio.Event()
+        # 阻塞策略下发布方等待队列腾出空间
+        self._not_full = asyncio.Event()
+        # 按事件类型分桶的订阅：无过滤函数的订阅可直接分发，带过滤函数的需逐个判断
+        self._no_filter: Dict[str, List[EventSubscription]] = defaultdict(list)
+        self._filtered: Dict[str, List[EventSubscription]] = defaultdict(list)
+        # 带FilterSpec的订阅按 事件类型 -> 属性名 -> 属性值 建立索引
+        self._indexed: Dict[str, Dict[str, Dict[Any, List[EventSubscription]]]] = {}
+        # 是否存在非默认优先级的订阅，决定合并各分桶结果时是否需要重新排序
+        self._priority_in_use = False
+        # 至少有一个订阅的事件类型，发布时用于跳过无人订阅的事件
+        self._subscribed_types: Set[str] = set()
+        # 每个事件类型的 (无过滤订阅, 带过滤函数订阅) 快照，订阅变化时失效
+        self._dispatch_cache: Dict[str, Tuple[Tuple[EventSubscription, ...], Tuple[EventSubscription, ...]]] = {}
+        
+        # 事件历史：预分配的环形缓冲区，_history_idx指向下一个写入位置
+        self.max_history_size = max_history_size
+        self._history: List[Optional[Event]] = [None] * max_history_size
+        self._history_idx = 0
+        self._history_full = False
         
-        # 添加信号量来控制并发处理器数量
-        self._handler_semaphore = asyncio.Semaphore(max_concurrent_handlers)
+        # 控制并发处理器数量：未饱和时只做计数，饱和时等待有处理器结束
+        self._active_handlers = 0
+        self._handler_slot_freed = asyncio.Event()
         
         self.running = False
         self.processor_task: Optional[asyncio.Task] = None
         
+        # 运行同步处理器的专用线程池，大小与处理器并发上限一致
+        self._executor: Optional[ThreadPoolExecutor] = None
+        
         # 增强的统计信息
         self.stats = {
             'events_published': 0,
@@ -454,55 +590,116 @@ class EventBus:
         self._processing_times: deque = deque(maxlen=100)
         self._last_health_check = datetime.now()
     
-    async def _handle_event_with_timeout(self, event: Event, timeout: float = 30.0) -> None:
-        """带超时的事件处理
+    def _get_matching_subscriptions(self, event: Event) -> List[EventSubscription]:
+        """获取与事件匹配的订阅
+        
+        各分桶内的订阅已按优先级排好序，只有在存在非默认优先级时才需要合并排序。
         
         Args:
+            event: 要分发的事件
+            
+        Returns:
+            匹配的订阅列表
+        """
+        event_type = event.EVENT_TYPE
+        cache = self._dispatch_cache.get(event_type)
+        if cache is None:
+            cache = (
+                tuple(self._no_filter.get(event_type, ())),
+                tuple(self._filtered.get(event_type, ()))
+            )
+            self._dispatch_cache[event_type] = cache
+        
+        no_filter_subs, filtered_subs = cache
+        matching_subscriptions = list(no_filter_subs)
+        for subscription in filtered_subs:
+            if subscription.filter_func(event):
+                matching_subscriptions.append(subscription)
+        
+        index = self._indexed.get(event_type)
+        if index:
+            for attr, by_value in index.items():
+                try:
+                    candidates = by_value.get(getattr(event, attr, _MISSING))
+                except TypeError:
+                    # 属性值不可哈希，不可能命中索引
+                    continue
+                if candidates:
+                    for subscription in candidates:
+                        if subscription.matches_indexed(event):
+                            matching_subscriptions.append(subscription)
+        
+        if self._priority_in_use and len(matching_subscriptions) > 1:
+            matching_subscriptions.sort(key=_priority_key)
+        return matching_subscriptions
+    
+    async def _run_handler(self, 
+                           subscription: EventSubscription, 
+                           event: Event, 
+                           timeout: Optional[float]) -> None:
+        """在并发数量限制下执行单个订阅的处理器
+        
+        Args:
+            subscription: 要执行的订阅
             event: 要处理的事件
-            timeout: 处理超时时间（秒）
+            timeout: 处理超时时间（秒），为None时不限时
         """
-        start_time = datetime.now()
+        while self._active_handlers >= self.max_concurrent_handlers:
+            self._handler_slot_freed.clear()
+            await self._handler_slot_freed.wait()
+        
+        self._active_handlers += 1
+        try:
+            if timeout is None:
+                await subscription.handle_event(event, self._executor)
+            else:
+                await asyncio.wait_for(
+                    subscription.handle_event(event, self._executor), 
+                    timeout=timeout
+                )
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"Handler timeout for subscription {subscription.subscription_id}"
+            )
+            self.stats['handler_timeouts'] += 1
+        except Exception as e:
+            logger.error(
+                f"Handler error for subscription {subscription.subscription_id}: {e}",
+                exc_info=True
+            )
+        finally:
+            self._active_handlers -= 1
+            self._handler_slot_freed.set()
+    
+    async def _handle_event(self, event: Event, timeout: Optional[float] = None) -> None:
+        """处理单个事件
+        
+        Args:
+            event: 要处理的事件
+            timeout: 单个处理器的超时时间（秒），为None时不限时
+        """
+        start_time = time.monotonic()
         
         try:
             # 添加到历史记录
-            self.event_history.append(event)
+            self._record_history(event)
             
             # 获取匹配的订阅
-            matching_subscriptions = []
-            for subscription in self.subscriptions.get(event.event_type, []):
-                if subscription.matches(event):
-                    matching_subscriptions.append(subscription)
+            matching_subscriptions = self._get_matching_subscriptions(event)
             
-            # 使用信号量控制并发处理
-            if matching_subscriptions:
-                async def handle_with_semaphore(subscription: EventSubscription) -> None:
-                    async with self._handler_semaphore:
-                        try:
-                            await asyncio.wait_for(
-                                subscription.handle_event(event), 
-                                timeout=timeout
-                            )
-                        except asyncio.TimeoutError:
-                            logger.warning(
-                                f"Handler timeout for subscription {subscription.subscription_id}"
-                            )
-                            self.stats['handler_timeouts'] += 1
-                        except Exception as e:
-                            logger.error(
-                                f"Handler error for subscription {subscription.subscription_id}: {e}",
-                                exc_info=True
-                            )
-                
-                # 并发处理所有匹配的订阅
-                tasks = [
-                    handle_with_semaphore(subscription)
-                    for subscription in matching_subscriptions
-                ]
-                await asyncio.gather(*tasks, return_exceptions=True)
+            # 单个订阅直接等待，避免gather的额外开销
+            count = len(matching_subscriptions)
+            if count == 1:
+                await self._run_handler(matching_subscriptions[0], event, timeout)
+            elif count > 1:
+                await asyncio.gather(
+                    *(self._run_handler(subscription, event, timeout)
+                      for subscription in matching_subscriptions),
+                    return_exceptions=True
+                )
             
             # 记录处理时间
-            processing_time = (datetime.now() - start_time).total_seconds()
-            self._processing_times.append(processing_time)
+            self._processing_times.append(time.monotonic() - start_time)
             
             self.stats['events_processed'] += 1
             
@@ -520,20 +717,27 @@ class EventBus:
             logger.warning("Event bus not running, events ignored")
             return
         
+        queue = self._queue
         successful = 0
         failed = 0
         
-        for event in events:
-            try:
-                await self.event_queue.put(event)
+        room = max(0, self.max_queue_size - len(queue))
+        if len(events) <= room:
+            # 队列空间充足时一次性入队
+            queue.extend(events)
+            successful = len(events)
+        else:
+            for event in events:
+                if len(queue) >= self.max_queue_size and not await self._make_room():
+                    failed += 1
+                    continue
+                queue.append(event)
+                self._not_empty.set()
                 successful += 1
-            except asyncio.QueueFull:
-                logger.error(f"Event queue full, dropping event {event.event_id}")
-                failed += 1
-                self.stats['queue_overflows'] += 1
         
+        if successful:
+            self._not_empty.set()
         self.stats['events_published'] += successful
-        self.stats['events_failed'] += failed
         
         logger.debug(f"Batch published: {successful} successful, {failed} failed")
     
@@ -554,8 +758,8 @@ class EventBus:
             'average_processing_time': avg_processing_time,
             'max_processing_time': max_processing_time,
             'min_processing_time': min_processing_time,
-            'active_handlers': self.max_concurrent_handlers - self._handler_semaphore._value,
-            'queue_utilization': self.event_queue.qsize() / self.max_queue_size,
+            'active_handlers': self._active_handlers,
+            'queue_utilization': len(self._queue) / self.max_queue_size,
             'last_health_check': self._last_health_check.isoformat()
         }
     
@@ -569,7 +773,7 @@ class EventBus:
         
         health_status = {
             'status': 'healthy' if self.running else 'stopped',
-            'queue_size': self.event_queue.qsize(),
+            'queue_size': len(self._queue),
             'queue_capacity': self.max_queue_size,
             'active_subscriptions': self.stats['active_subscriptions'],
             'processor_running': self.processor_task is not None and not self.processor_task.done(),
@@ -577,7 +781,7 @@ class EventBus:
         }
         
         # 检查队列是否接近满载
-        if self.event_queue.qsize() > self.max_queue_size * 0.8:
+        if len(self._queue) > self.max_queue_size * 0.8:
             health_status['warnings'] = ['Queue utilization high']
         
         # 检查是否有过多的超时
@@ -592,6 +796,10 @@ class EventBus:
             return
         
         self.running = True
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrent_handlers,
+            thread_name_prefix="evbus"
+        )
         self.processor_task = asyncio.create_task(self._process_events())
         logger.info("Event bus started")
     
@@ -601,6 +809,8 @@ class EventBus:
             return
         
         self.running = False
+        # 唤醒阻塞等待队列空间的发布方
+        self._not_full.set()
         
         if self.processor_task:
             self.processor_task.cancel()
@@ -609,13 +819,19 @@ class EventBus:
             except asyncio.CancelledError:
                 pass
         
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        
         logger.info("Event bus stopped")
     
     def subscribe(self, 
                  event_type: str,
                  handler: Union[EventHandler, AsyncEventHandler],
                  subscriber_id: str,
-                 filter_func: Optional[Callable[[Event], bool]] = None) -> str:
+                 filter_func: Optional[Callable[[Event], bool]] = None,
+                 filter_spec: Optional[FilterSpec] = None,
+                 priority: int = 0) -> str:
         """订阅事件
         
         Args:
@@ -623,12 +839,30 @@ class EventBus:
             handler: 事件处理器
             subscriber_id: 订阅者ID
             filter_func: 事件过滤函数
+            filter_spec: 声明式属性过滤条件，可被索引，优先于filter_func使用
+            priority: 优先级（数字越大越先分发）
             
         Returns:
             订阅ID
         """
-        subscription = EventSubscription(event_type, handler, subscriber_id, filter_func)
-        self.subscriptions[event_type].append(subscription)
+        subscription = EventSubscription(
+            event_type, handler, subscriber_id, filter_func, priority, filter_spec=filter_spec
+        )
+        if subscription._spec_items:
+            # 以第一个属性建立索引，其余条件在命中后由matches检查
+            attr, value = subscription._spec_items[0]
+            by_value = self._indexed.setdefault(event_type, {}).setdefault(attr, {})
+            subscriptions = by_value.setdefault(value, [])
+        elif filter_func is None:
+            subscriptions = self._no_filter[event_type]
+        else:
+            subscriptions = self._filtered[event_type]
+        # 订阅时按优先级有序插入，同优先级保持订阅顺序
+        bisect.insort(subscriptions, subscription, key=_priority_key)
+        self._dispatch_cache.pop(event_type, None)
+        if priority:
+            self._priority_in_use = True
+        self._subscribed_types.add(event_type)
         self.stats['active_subscriptions'] += 1
         
         logger.debug(f"Subscribed to {event_type}: {subscriber_id}")
@@ -643,16 +877,54 @@ class EventBus:
         Returns:
             是否成功取消
         """
-        for event_type, subscriptions in self.subscriptions.items():
+        for event_type, subscriptions in self._iter_subscription_lists():
             for i, subscription in enumerate(subscriptions):
                 if subscription.subscription_id == subscription_id:
                     del subscriptions[i]
+                    self._dispatch_cache.pop(event_type, None)
+                    self._refresh_subscribed_type(event_type)
                     self.stats['active_subscriptions'] -= 1
                     logger.debug(f"Unsubscribed: {subscription_id}")
                     return True
         
         return False
     
+    def _iter_subscription_lists(self) -> Iterator[Tuple[str, List[EventSubscription]]]:
+        """遍历所有存放订阅的列表
+        
+        Returns:
+            (事件类型, 订阅列表) 迭代器
+        """
+        for buckets in (self._no_filter, self._filtered):
+            yield from buckets.items()
+        for event_type, index in self._indexed.items():
+            for by_value in index.values():
+                for subscriptions in by_value.values():
+                    yield event_type, subscriptions
+    
+    def _refresh_subscribed_type(self, event_type: str) -> None:
+        """在取消订阅后更新有订阅者的事件类型集合
+        
+        Args:
+            event_type: 发生变化的事件类型
+        """
+        index = self._indexed.get(event_type)
+        if index:
+            # 清理索引中已经为空的条目
+            for attr in list(index):
+                by_value = index[attr]
+                for value in [v for v, subs in by_value.items() if not subs]:
+                    del by_value[value]
+                if not by_value:
+                    del index[attr]
+            if not index:
+                del self._indexed[event_type]
+        
+        if (not self._no_filter.get(event_type) 
+                and not self._filtered.get(event_type) 
+                and event_type not in self._indexed):
+            self._subscribed_types.discard(event_type)
+    
     def unsubscribe_all(self, subscriber_id: str) -> int:
         """取消指定订阅者的所有订阅
         
@@ -663,16 +935,23 @@ class EventBus:
             取消的订阅数量
         """
         count = 0
-        for event_type, subscriptions in self.subscriptions.items():
+        changed_types = set()
+        for event_type, subscriptions in list(self._iter_subscription_lists()):
             original_count = len(subscriptions)
             subscriptions[:] = [
                 sub for sub in subscriptions 
                 if sub.subscriber_id != subscriber_id
             ]
             removed = original_count - len(subscriptions)
+            if removed:
+                changed_types.add(event_type)
             count += removed
             self.stats['active_subscriptions'] -= removed
         
+        for event_type in changed_types:
+            self._dispatch_cache.pop(event_type, None)
+            self._refresh_subscribed_type(event_type)
+        
         if count > 0:
             logger.debug(f"Unsubscribed all for {subscriber_id}: {count} subscriptions")
         
@@ -681,6 +960,9 @@ class EventBus:
     async def publish(self, event: Event) -> None:
         """发布事件
         
+        事件发布后由事件总线持有（待处理队列与历史记录都保留引用），
+        发布方不得复用或修改已发布的事件对象。
+        
         Args:
             event: 要发布的事件
         """
@@ -688,14 +970,44 @@ class EventBus:
             logger.warning("Event bus not running, event ignored")
             return
         
-        try:
-            await self.event_queue.put(event)
+        # 无人订阅的事件只记录历史，无需经过队列
+        if event.EVENT_TYPE not in self._subscribed_types:
+            self._record_history(event)
             self.stats['events_published'] += 1
-            logger.debug(f"Event published: {event.event_type} - {event.event_id}")
-            
-        except asyncio.QueueFull:
-            logger.error("Event queue full, dropping event")
-            self.stats['events_failed'] += 1
+            self.stats['events_processed'] += 1
+            return
+        
+        if len(self._queue) >= self.max_queue_size and not await self._make_room():
+            return
+        
+        self._queue.append(event)
+        self._not_empty.set()
+        self.stats['events_published'] += 1
+        logger.debug("Event published: %s - %s", event.EVENT_TYPE, event.event_id)
+    
+    async def _make_room(self) -> bool:
+        """队列已满时按溢出策略处理
+        
+        Returns:
+            是否可以继续将新事件入队
+        """
+        if self.overflow_policy == "block":
+            while len(self._queue) >= self.max_queue_size:
+                if not self.running:
+                    return False
+                self._not_full.clear()
+                await self._not_full.wait()
+            return True
+        
+        self.stats['queue_overflows'] += 1
+        self.stats['events_failed'] += 1
+        if self.overflow_policy == "drop-oldest":
+            dropped = self._queue.popleft()
+            logger.error(f"Event queue full, dropping oldest event {dropped.event_id}")
+            return True
+        
+        logger.error("Event queue full, dropping event")
+        return False
     
     async def publish_sync(self, event: Event) -> None:
         """同步发布事件（立即处理）
@@ -706,52 +1018,64 @@ class EventBus:
         await self._handle_event(event)
     
     async def _process_events(self) -> None:
-        """事件处理循环"""
+        """事件处理循环
+        
+        队列为空时等待非空信号，之后一次性取出已就绪的事件并并发处理。
+        停止时由stop()取消本任务。
+        """
+        queue = self._queue
+        not_empty = self._not_empty
         while self.running:
             try:
-                # 等待事件，带超时
-                event = await asyncio.wait_for(
-                    self.event_queue.get(), timeout=1.0
-                )
+                if not queue:
+                    not_empty.clear()
+                    await not_empty.wait()
+                    continue
+                
+                batch = [queue.popleft() for _ in range(min(len(queue), self.batch_max))]
+                self._not_full.set()
                 
-                await self._handle_event(event)
+                if len(batch) == 1:
+                    await self._handle_event(batch[0])
+                else:
+                    await asyncio.gather(
+                        *(self._handle_event(event) for event in batch),
+                        return_exceptions=True
+                    )
                 
-            except asyncio.TimeoutError:
-                # 超时是正常的，继续循环
-                continue
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
                 logger.error(f"Error processing event: {e}", exc_info=True)
                 self.stats['events_failed'] += 1
     
-    async def _handle_event(self, event: Event) -> None:
-        """处理单个事件
+    def _record_history(self, event: Event) -> None:
+        """将事件写入历史环形缓冲区
         
         Args:
-            event: 要处理的事件
+            event: 要记录的事件
         """
-        try:
-            # 添加到历史记录
-            self.event_history.append(event)
-            
-            # 获取匹配的订阅
-            matching_subscriptions = []
-            for subscription in self.subscriptions.get(event.event_type, []):
-                if subscription.matches(event):
-                    matching_subscriptions.append(subscription)
-            
-            # 并发处理所有匹配的订阅
-            if matching_subscriptions:
-                tasks = [
-                    subscription.handle_event(event)
-                    for subscription in matching_subscriptions
-                ]
-                await asyncio.gather(*tasks, return_exceptions=True)
-            
-            self.stats['events_processed'] += 1
-            
-        except Exception as e:
-            logger.error(f"Error handling event {event.event_id}: {e}", exc_info=True)
-            self.stats['events_failed'] += 1
+        # 历史大小为0时关闭历史记录
+        if not self.max_history_size:
+            return
+        idx = self._history_idx
+        self._history[idx] = event
+        idx += 1
+        if idx == self.max_history_size:
+            idx = 0
+            self._history_full = True
+        self._history_idx = idx
+    
+    @property
+    def event_history(self) -> List[Event]:
+        """按时间顺序排列的事件历史快照
+        
+        Returns:
+            事件列表（从旧到新）
+        """
+        if self._history_full:
+            return self._history[self._history_idx:] + self._history[:self._history_idx]
+        return self._history[:self._history_idx]
     
     def get_event_history(self, 
                          event_type: Optional[str] = None,
@@ -765,12 +1089,44 @@ class EventBus:
         Returns:
             事件列表
         """
-        events = list(self.event_history)
+        if limit <= 0:
+            events = self.event_history
+            if event_type:
+                events = [e for e in events if e.EVENT_TYPE == event_type]
+            return events[-limit:]
+        
+        history = self._history
+        idx = self._history_idx
+        if not event_type:
+            # 直接在环形缓冲区上切片，只分配结果大小的列表
+            if limit <= idx or not self._history_full:
+                return history[max(0, idx - limit):idx]
+            wrap = min(limit, self.max_history_size) - idx
+            return history[self.max_history_size - wrap:] + history[:idx]
         
-        if event_type:
-            events = [e for e in events if e.event_type == event_type]
+        # 从最新的事件向前查找，凑够limit个即停止
+        result = []
+        for event in self._iter_history_reversed():
+            if event.EVENT_TYPE == event_type:
+                result.append(event)
+                if len(result) >= limit:
+                    break
+        result.reverse()
+        return result
+    
+    def _iter_history_reversed(self) -> Iterator[Event]:
+        """从新到旧遍历事件历史
         
-        return events[-limit:]
+        Returns:
+            事件迭代器
+        """
+        history = self._history
+        idx = self._history_idx
+        for i in range(idx - 1, -1, -1):
+            yield history[i]
+        if self._history_full:
+            for i in range(self.max_history_size - 1, idx - 1, -1):
+                yield history[i]
     
     def get_statistics(self) -> Dict[str, Any]:
         """获取统计信息
@@ -780,9 +1136,9 @@ class EventBus:
         """
         return {
             **self.stats,
-            'queue_size': self.event_queue.qsize(),
-            'history_size': len(self.event_history),
-            'subscription_types': list(self.subscriptions.keys())
+            'queue_size': len(self._queue),
+            'history_size': self.max_history_size if self._history_full else self._history_idx,
+            'subscription_types': list(dict.fromkeys([*self._no_filter, *self._filtered, *self._indexed]))
         }
     
     def get_stats(self) -> Dict[str, Any]:
@@ -795,7 +1151,9 @@ class EventBus:
     
     def clear_history(self) -> None:
         """清空事件历史"""
-        self.event_history.clear()
+        self._history = [None] * self.max_history_size
+        self._history_idx = 0
+        self._history_full = False
         logger.info("Event history cleared")
 
 
@@ -839,14 +1197,15 @@ async def publish_event(event: Event) -> None:
     Args:
         event: 要发布的事件
     """
-    event_bus = get_global_event_bus()
-    await event_bus.publish(event)
+    # 全局总线已创建时直接使用，跳过get_global_event_bus的调用
+    await (_global_event_bus or get_global_event_bus()).publish(event)
 
 
 def subscribe_event(event_type: str,
                    handler: Union[EventHandler, AsyncEventHandler],
                    subscriber_id: str,
-                   filter_func: Optional[Callable[[Event], bool]] = None) -> str:
+                   filter_func: Optional[Callable[[Event], bool]] = None,
+                   filter_spec: Optional[FilterSpec] = None) -> str:
     """订阅全局事件总线的事件
     
     Args:
@@ -854,12 +1213,13 @@ def subscribe_event(event_type: str,
         handler: 事件处理器
         subscriber_id: 订阅者ID
         filter_func: 事件过滤函数
+        filter_spec: 声明式属性过滤条件
         
     Returns:
         订阅ID
     """
     event_bus = get_global_event_bus()
-    return event_bus.subscribe(event_type, handler, subscriber_id, filter_func)
+    return event_bus.subscribe(event_type, handler, subscriber_id, filter_func, filter_spec)
 
 
 def unsubscribe_event(subscription_id: str) -> bool:
@@ -911,8 +1271,40 @@ async def publish_event_enhanced_compatible(event) -> None:
         await publish_enhanced_event(event)
     else:
         # This is a standard event or enhanced bus not available
-        event_bus = get_global_event_bus()
-        await event_bus.publish(event)
+        await (_global_event_bus or get_global_event_bus()).publish(event)
+
+
+# Standard event builders keyed by event type value, built once at import
+_STD_EVENT_BUILDERS: Dict[str, Callable[[dict, Optional[str]], Event]] = {
+    event_type.value: (
+        lambda data, source: SystemEvent(message=str(data), data=data, source=source)
+    )
+    for event_type in EventType
+}
+_STD_EVENT_BUILDERS.update({
+    EventType.SYSTEM.value: lambda data, source: SystemEvent(
+        message=data.get("message", ""), data=data, source=source
+    ),
+    EventType.TASK.value: lambda data, source: TaskEvent(
+        task_id=data.get("task_id", ""),
+        action=data.get("action", ""),
+        data=data,
+        source=source
+    ),
+    EventType.ROBOT.value: lambda data, source: RobotEvent(
+        robot_id=data.get("robot_id", ""),
+        action=data.get("action", ""),
+        data=data,
+        source=source
+    ),
+    EventType.SKILL.value: lambda data, source: SkillEvent(
+        skill_name=data.get("skill_name", ""),
+        robot_id=data.get("robot_id", ""),
+        action=data.get("action", ""),
+        data=data,
+        source=source
+    ),
+})
 
 
 def create_bridge_event(event_type: str, 
@@ -948,7 +1340,7 @@ def create_bridge_event(event_type: str,
         event_priority = priority_map.get(priority, EventPriority.NORMAL)
         
         # Create appropriate enhanced event type
-        if event_type.startswith("system") or event_type.startswith("debug"):
+        if event_type.startswith(("system", "debug")):
             return SystemDebugEvent(
                 source=source,
                 component=data.get("component", "unknown"),
@@ -956,7 +1348,7 @@ def create_bridge_event(event_type: str,
                 details=data.get("details", {}),
                 priority=event_priority
             )
-        elif event_type.startswith("user") or event_type.startswith("ui"):
+        elif event_type.startswith(("user", "ui")):
             return UserInterfaceEvent(
                 source=source,
                 title=data.get("title", "Notification"),
@@ -964,7 +1356,7 @@ def create_bridge_event(event_type: str,
                 icon=data.get("icon", "info"),
                 priority=event_priority
             )
-        elif event_type.startswith("scene") or event_type.startswith("environment"):
+        elif event_type.startswith(("scene", "environment")):
             return SceneChangeEvent(
                 source=source,
                 scene_id=data.get("scene_id", "unknown"),
@@ -996,40 +1388,13 @@ def create_bridge_event(event_type: str,
             )
     
     # Fallback to standard event
-    if event_type in [e.value for e in EventType]:
-        event_enum = EventType(event_type)
-    else:
-        event_enum = EventType.SYSTEM
-    
-    if event_enum == EventType.SYSTEM:
-        return SystemEvent(message=data.get("message", ""), data=data, source=source)
-    elif event_enum == EventType.TASK:
-        return TaskEvent(
-            task_id=data.get("task_id", ""),
-            action=data.get("action", ""),
-            data=data,
-            source=source
-        )
-    elif event_enum == EventType.ROBOT:
-        return RobotEvent(
-            robot_id=data.get("robot_id", ""),
-            action=data.get("action", ""),
-            data=data,
-            source=source
-        )
-    elif event_enum == EventType.SKILL:
-        return SkillEvent(
-            skill_name=data.get("skill_name", ""),
-            robot_id=data.get("robot_id", ""),
-            action=data.get("action", ""),
-            data=data,
-            source=source
-        )
-    else:
-        return SystemEvent(message=str(data), data=data, source=source)
+    builder = _STD_EVENT_BUILDERS.get(event_type)
+    if builder is None:
+        builder = _STD_EVENT_BUILDERS["system"]
+    return builder(data, source)
 
 
-@dataclass
+@dataclass(slots=True, eq=False)
 class SceneEntityEvent(Event):
     """场景实体事件
     
@@ -1055,12 +1420,10 @@ class SceneEntityEvent(Event):
     position: Optional[Dict[str, float]] = None
     affected_entities: List[str] = field(default_factory=list)
     
-    @property
-    def event_type(self) -> str:
-        return EventType.SCENE_ENTITY.value
+    EVENT_TYPE: ClassVar[str] = EventType.SCENE_ENTITY.value
 
 
-@dataclass
+@dataclass(slots=True, eq=False)
 class SceneBatchEvent(Event):
     """场景批量变更事件
     
@@ -1080,6 +1443,4 @@ class SceneBatchEvent(Event):
     entity_changes: List[Dict[str, Any]] = field(default_factory=list)
     validation_results: Dict[str, Any] = field(default_factory=dict)
     
-    @property
-    def event_type(self) -> str:
-        return EventType.SCENE_BATCH.value
+    EVENT_TYPE: ClassVar[str] = EventType.SCENE_BATCH.value
@@ -4,8 +4,9 @@
 """
 
 import asyncio
+import functools
 import logging
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Literal, Tuple
 from contextlib import asynccontextmanager
 
 from .event_bus import (
@@ -25,16 +26,12 @@ class EventManager:
     
     def __init__(self):
         """初始化事件管理器"""
-        if hasattr(self, '_initialized'):
-            return
-        
         self._event_bus: Optional[EventBus] = None
         self._is_running = False
         self._startup_tasks: List[asyncio.Task] = []
         self._shutdown_tasks: List[asyncio.Task] = []
         self._health_monitor_task: Optional[asyncio.Task] = None
         self._health_check_interval = 60.0  # 60秒健康检查间隔
-        self._initialized = True
         
         # 添加优雅关闭支持
         self._shutdown_event = asyncio.Event()
@@ -45,13 +42,15 @@ class EventManager:
     async def start(self, 
                    max_queue_size: int = 1000, 
                    max_concurrent_handlers: int = 100,
-                   enable_health_monitoring: bool = True) -> None:
+                   enable_health_monitoring: bool = True,
+                   overflow_policy: str = "block") -> None:
         """启动事件管理器
         
         Args:
             max_queue_size: 事件队列最大大小
             max_concurrent_handlers: 最大并发处理器数量
             enable_health_monitoring: 是否启用健康监控
+            overflow_policy: 事件队列满时的处理策略（block、drop-newest、drop-oldest），默认阻塞
         """
         if self._is_running:
             logger.warning("EventManager is already running")
@@ -62,7 +61,8 @@ class EventManager:
             if self._event_bus is None:
                 self._event_bus = EventBus(
                     max_queue_size=max_queue_size,
-                    max_concurrent_handlers=max_concurrent_handlers
+                    max_concurrent_handlers=max_concurrent_handlers,
+                    overflow_policy=overflow_policy
                 )
                 set_global_event_bus(self._event_bus)
             
@@ -97,7 +97,8 @@ class EventManager:
                 {
                     "max_queue_size": max_queue_size,
                     "max_concurrent_handlers": max_concurrent_handlers,
-                    "health_monitoring": enable_health_monitoring
+                    "health_monitoring": enable_health_monitoring,
+                    "overflow_policy": overflow_policy
                 }
             )
             
@@ -134,48 +135,59 @@ class EventManager:
             if self._health_monitor_task:
                 self._health_monitor_task.cancel()
                 try:
-                    await asyncio.wait_for(
-                        self._health_monitor_task, 
-                        timeout=5.0
-                    )
-                except (asyncio.CancelledError, asyncio.TimeoutError):
+                    await self._health_monitor_task
+                except asyncio.CancelledError:
                     pass
                 self._health_monitor_task = None
             
-            # 等待所有启动任务完成
-            if self._startup_tasks:
-                await asyncio.wait_for(
-                    asyncio.gather(*self._startup_tasks, return_exceptions=True),
-                    timeout=stop_timeout / 2
-                )
+            # 在统一的截止时间内等待启动任务完成并执行关闭任务；
+            # 超时后TaskGroup会取消并等待剩余任务结束
+            try:
+                async with asyncio.timeout(stop_timeout):
+                    await self._drain_tasks(self._startup_tasks, "Startup")
+                    await self._drain_tasks(self._shutdown_tasks, "Shutdown")
+            except TimeoutError:
+                logger.warning(f"EventManager stop timeout after {stop_timeout}s")
+            finally:
                 self._startup_tasks.clear()
-            
-            # 执行关闭任务
-            if self._shutdown_tasks:
-                await asyncio.wait_for(
-                    asyncio.gather(*self._shutdown_tasks, return_exceptions=True),
-                    timeout=stop_timeout / 2
-                )
                 self._shutdown_tasks.clear()
             
-            # 停止事件总线
-            await stop_global_event_bus()
-            self._is_running = False
+            # 停止事件总线，调用方被取消时也要完成
+            await asyncio.shield(stop_global_event_bus())
             
             logger.info("EventManager stopped successfully")
             
-        except asyncio.TimeoutError:
-            logger.warning(f"EventManager stop timeout after {stop_timeout}s")
-            self._is_running = False
         except Exception as e:
             logger.error(f"Failed to stop EventManager: {e}")
-            self._is_running = False
             raise
         finally:
+            self._is_running = False
             self._shutdown_event.clear()
     
+    @staticmethod
+    async def _drain_tasks(tasks: List[Any], kind: str) -> None:
+        """并发等待一组任务或协程完成，单个任务失败不影响其他任务
+        
+        Args:
+            tasks: 任务或协程列表
+            kind: 任务类别，用于日志
+        """
+        if not tasks:
+            return
+        
+        async def run(index: int, awaitable: Any) -> None:
+            try:
+                await awaitable
+            except Exception as e:
+                logger.error(f"{kind} task {index} failed: {e}")
+        
+        async with asyncio.TaskGroup() as tg:
+            for i, task in enumerate(tasks):
+                tg.create_task(run(i, task))
+    
     async def _health_monitor_loop(self) -> None:
         """健康监控循环"""
+        error_backoff = 1.0
         while self._is_running and not self._shutdown_event.is_set():
             try:
                 if self._event_bus:
@@ -194,19 +206,22 @@ class EventManager:
                             f"Event bus health status: {health_status['status']}",
                             health_status
                         )
+                error_backoff = 1.0
+                wait_time = self._health_check_interval
                 
-                # 等待下次检查
-                await asyncio.wait_for(
-                    self._shutdown_event.wait(),
-                    timeout=self._health_check_interval
-                )
-                
-            except asyncio.TimeoutError:
-                # 超时是正常的，继续下一次检查
-                continue
             except Exception as e:
                 logger.error(f"Health monitor error: {e}")
-                await asyncio.sleep(self._health_check_interval)
+                # 出错后指数退避重试，最长不超过正常检查间隔
+                wait_time = min(error_backoff, self._health_check_interval)
+                error_backoff *= 2
+            
+            # 等待下次检查，收到关闭信号时立即退出
+            try:
+                async with asyncio.timeout(wait_time):
+                    await self._shutdown_event.wait()
+                break
+            except TimeoutError:
+                continue
     
     async def get_health_status(self) -> Dict[str, Any]:
         """获取健康状态
@@ -299,14 +314,17 @@ class EventManager:
             message: 事件消息
             data: 事件数据
         """
+        event_bus = self._event_bus
+        if event_bus is None or not event_bus.running:
+            return
+        
         try:
-            if self._event_bus and self._event_bus.running:
-                event = SystemEvent(
-                    message=message,
-                    source="event_manager",
-                    data=data or {"action": action}
-                )
-                await self._event_bus.publish(event)
+            event = SystemEvent(
+                message=message,
+                source="event_manager",
+                data=data or {"action": action}
+            )
+            await event_bus.publish(event)
         except Exception as e:
             logger.error(f"Failed to publish system event: {e}")
     
@@ -329,20 +347,14 @@ class EventManager:
             await self.stop()
 
 
-# 全局事件管理器实例
-_global_event_manager: Optional[EventManager] = None
-
-
+@functools.cache
 def get_event_manager() -> EventManager:
-    """获取全局事件管理器实例
+    """获取全局事件管理器实例（首次调用时创建）
     
     Returns:
         全局事件管理器实例
     """
-    global _global_event_manager
-    if _global_event_manager is None:
-        _global_event_manager = EventManager()
-    return _global_event_manager
+    return EventManager()
 
 
 async def start_event_system(max_queue_size: int = 1000) -> EventManager:
@@ -417,6 +429,27 @@ async def event_system_context(max_queue_size: int = 1000):
 
 
 # 便捷函数
+def _running_event_bus() -> Optional[EventBus]:
+    """获取正在运行的全局事件总线
+    
+    Returns:
+        事件总线实例，未运行时返回None
+    """
+    event_bus = get_global_event_bus()
+    return event_bus if event_bus.running else None
+
+
+async def _publish_system_message(event_bus: EventBus, message: str, data: Dict[str, Any]) -> None:
+    """向已确认运行中的事件总线发布系统消息事件
+    
+    Args:
+        event_bus: 事件总线
+        message: 消息内容
+        data: 事件数据
+    """
+    await event_bus.publish(SystemEvent(message=message, source="system", data=data))
+
+
 async def publish_system_message(message: str, data: Optional[Dict[str, Any]] = None) -> None:
     """发布系统消息事件
     
@@ -424,14 +457,40 @@ async def publish_system_message(message: str, data: Optional[Dict[str, Any]] =
         message: 消息内容
         data: 事件数据
     """
-    from .event_bus import publish_event
+    # 事件总线未运行时直接返回，不构造事件
+    event_bus = _running_event_bus()
+    if event_bus is None:
+        return
+    await _publish_system_message(event_bus, message, data or {})
+
+
+# 系统消息类别 -> (消息前缀, 标记键, 数据键)
+_SYSTEM_MESSAGE_KINDS: Dict[str, Tuple[str, str, str]] = {
+    "error": ("System Error: ", "error", "error_data"),
+    "warning": ("System Warning: ", "warning", "warning_data"),
+    "info": ("System Info: ", "info", "info_data"),
+}
+
+
+async def publish_system_typed(kind: Literal["error", "warning", "info"],
+                               message: str,
+                               data: Optional[Dict[str, Any]] = None) -> None:
+    """发布带类别的系统消息事件
     
-    event = SystemEvent(
-        message=message,
-        source="system",
-        data=data or {}
+    Args:
+        kind: 消息类别（error、warning、info）
+        message: 消息内容
+        data: 事件数据
+    """
+    event_bus = _running_event_bus()
+    if event_bus is None:
+        return
+    prefix, flag_key, data_key = _SYSTEM_MESSAGE_KINDS[kind]
+    await _publish_system_message(
+        event_bus,
+        prefix + message,
+        {flag_key: True, data_key: data or {}}
     )
-    await publish_event(event)
 
 
 async def publish_system_error(error_message: str, error_data: Optional[Dict[str, Any]] = None) -> None:
@@ -441,10 +500,7 @@ async def publish_system_error(error_message: str, error_data: Optional[Dict[str
         error_message: 错误消息
         error_data: 错误数据
     """
-    await publish_system_message(
-        f"System Error: {error_message}",
-        {"error": True, "error_data": error_data or {}}
-    )
+    await publish_system_typed("error", error_message, error_data)
 
 
 async def publish_system_warning(warning_message: str, warning_data: Optional[Dict[str, Any]] = None) -> None:
@@ -454,10 +510,7 @@ async def publish_system_warning(warning_message: str, warning_data: Optional[Di
         warning_message: 警告消息
         warning_data: 警告数据
     """
-    await publish_system_message(
-        f"System Warning: {warning_message}",
-        {"warning": True, "warning_data": warning_data or {}}
-    )
+    await publish_system_typed("warning", warning_message, warning_data)
 
 
 async def publish_system_info(info_message: str, info_data: Optional[Dict[str, Any]] = None) -> None:
@@ -467,7 +520,4 @@ async def publish_system_info(info_message: str, info_data: Optional[Dict[str, A
         info_message: 信息消息
         info_data: 信息数据
     """
-    await publish_system_message(
-        f"System Info: {info_message}",
-        {"info": True, "info_data": info_data or {}}
-    )
\ No newline at end of file
+    await publish_system_typed("info", info_message, info_data)
@@ -0,0 +1,122 @@
+"""
+关系图的力导向布局（Fruchterman-Reingold）。
+
+安装了 numba 时使用 JIT 编译并按节点并行计算斥力的内核；
+否则回退到基于广播的 NumPy 实现，两者算法相同。
+"""
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+def _normalize(pos: np.ndarray) -> np.ndarray:
+    """将坐标按轴缩放到 [0, 1]，跨度为零的轴放在 0.5。"""
+    lo = pos.min(axis=0)
+    span = pos.max(axis=0) - lo
+    out = np.full_like(pos, 0.5)
+    nonzero = span > 0
+    out[:, nonzero] = (pos[:, nonzero] - lo[nonzero]) / span[nonzero]
+    return out
+
+
+def _fruchterman_reingold_numpy(edges: np.ndarray, pos: np.ndarray, iterations: int) -> np.ndarray:
+    n = pos.shape[0]
+    k = np.sqrt(1.0 / n)
+    t = 0.1
+    dt = t / (iterations + 1)
+    for _ in range(iterations):
+        delta = pos[:, None, :] - pos[None, :, :]
+        dist2 = np.maximum((delta ** 2).sum(axis=2), 1e-12)
+        np.fill_diagonal(dist2, np.inf)
+        disp = (delta * (k * k / dist2)[:, :, None]).sum(axis=1)
+
+        if edges.shape[0]:
+            a, b = edges[:, 0], edges[:, 1]
+            d = pos[a] - pos[b]
+            dist = np.maximum(np.sqrt((d ** 2).sum(axis=1)), 1e-6)
+            force = d * (dist / k)[:, None]
+            np.subtract.at(disp, a, force)
+            np.add.at(disp, b, force)
+
+        length = np.sqrt((disp ** 2).sum(axis=1))
+        scale = np.where(length > 0, np.minimum(length, t) / np.maximum(length, 1e-12), 0.0)
+        pos = pos + disp * scale[:, None]
+        t -= dt
+    return pos
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, parallel=True)
+    def _fruchterman_reingold_jit(edges, pos, iterations):
+        n = pos.shape[0]
+        k = np.sqrt(1.0 / n)
+        t = 0.1
+        dt = t / (iterations + 1)
+        pos = pos.copy()
+        disp = np.empty_like(pos)
+        for _ in range(iterations):
+            # 斥力：每个节点只写自己的位移，可按节点并行
+            for i in prange(n):
+                fx = 0.0
+                fy = 0.0
+                for j in range(n):
+                    if i != j:
+                        dx = pos[i, 0] - pos[j, 0]
+                        dy = pos[i, 1] - pos[j, 1]
+                        d2 = max(dx * dx + dy * dy, 1e-12)
+                        f = k * k / d2
+                        fx += dx * f
+                        fy += dy * f
+                disp[i, 0] = fx
+                disp[i, 1] = fy
+
+            # 引力：一条边同时写两个端点，必须顺序累加
+            for e in range(edges.shape[0]):
+                a = edges[e, 0]
+                b = edges[e, 1]
+                dx = pos[a, 0] - pos[b, 0]
+                dy = pos[a, 1] - pos[b, 1]
+                f = max(np.sqrt(dx * dx + dy * dy), 1e-6) / k
+                disp[a, 0] -= dx * f
+                disp[a, 1] -= dy * f
+                disp[b, 0] += dx * f
+                disp[b, 1] += dy * f
+
+            for i in prange(n):
+                length = np.sqrt(disp[i, 0] ** 2 + disp[i, 1] ** 2)
+                if length > 0:
+                    scale = min(length, t) / length
+                    pos[i, 0] += disp[i, 0] * scale
+                    pos[i, 1] += disp[i, 1] * scale
+            t -= dt
+        return pos
+
+    _fruchterman_reingold = _fruchterman_reingold_jit
+else:
+    _fruchterman_reingold = _fruchterman_reingold_numpy
+
+
+def fruchterman_reingold(edges: np.ndarray, n_nodes: int, iterations: int = 50, seed: int = 0) -> np.ndarray:
+    """
+    计算力导向布局。
+
+    Args:
+        edges (np.ndarray): (E, 2) 的 int64 数组，每行是一条边两端节点的下标。
+        n_nodes (int): 节点数量。
+        iterations (int): 迭代次数。
+        seed (int): 初始位置的随机种子，相同输入得到相同布局。
+
+    Returns:
+        np.ndarray: (n_nodes, 2) 的 float64 数组，各轴缩放到 [0, 1]。
+    """
+    if n_nodes == 0:
+        return np.empty((0, 2), dtype=np.float64)
+    pos = np.random.default_rng(seed).random((n_nodes, 2))
+    if n_nodes > 1:
+        edges = np.ascontiguousarray(edges, dtype=np.int64).reshape(-1, 2)
+        pos = _fruchterman_reingold(edges, pos, iterations)
+    return _normalize(pos)
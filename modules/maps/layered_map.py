@@ -1,6 +1,11 @@
 import numpy as np
 import copy
-from typing import Any, Dict, List, Tuple, Optional
+from typing import Any, Callable, Dict, List, Tuple, Optional
+
+from ._kernels import fill_rects
+
+# 语义层实际存储的是对象ID的内部索引，0 表示空白
+_SEMANTIC_INDEX_DTYPE = np.dtype(np.int32)
 
 
 class LayeredGridMap:
@@ -27,8 +32,8 @@ class LayeredGridMap:
         if not required_keys.issubset(config):
             raise ValueError(f"配置字典必须包含以下键: {required_keys}")
 
-        # 保存原始配置以便能够重置到初始状态
-        self._original_config = copy.deepcopy(config)
+        # 保留原始配置的引用；重置到初始状态时使用下方的图层快照，不再重新解析配置
+        self._original_config = config
 
         self.resolution = config['resolution']
         self.bounds = config['bounds']
@@ -37,13 +42,37 @@ class LayeredGridMap:
 
         self.width_in_cells = int(np.ceil((self.bounds['x_max'] - self.bounds['x_min']) / self.resolution))
         self.height_in_cells = int(np.ceil((self.bounds['y_max'] - self.bounds['y_min']) / self.resolution))
+        # 坐标转换使用的地图原点
+        self._x_min = self.bounds['x_min']
+        self._y_min = self.bounds['y_min']
+        self._origin = np.array([self._x_min, self._y_min], dtype=float)
 
         self.layers: Dict[str, np.ndarray] = {}
+        # 同dtype的图层存放在同一个三维数组中，self.layers中的图层是其切片视图
+        # 每项为 (图层堆栈, 可广播的初始值数组, 图层名列表)
+        self._layer_stacks: List[Tuple[np.ndarray, np.ndarray, List[str]]] = []
+        # 按配置顺序排列的 (图层名, 堆栈序号, 堆栈内序号)，用于从堆栈结果组装按图层名的字典
+        self._layer_order: List[Tuple[str, int, int]] = []
+        # 绘制足迹时使用的填充值与语义层，初始化图层时缓存
+        self._fill_vals: Dict[str, Any] = {}
+        self._semantic_layer: Optional[np.ndarray] = None
+        # 语义ID驻留表：语义层存储稠密的int32索引，读取时再转换回对象ID
+        self._sid_to_idx: Dict[Any, int] = {}
+        self._idx_to_sid: List[Any] = []
+        self._sid_lookup: Optional[np.ndarray] = None
+        self._semantic_dtype: Optional[np.dtype] = None
         self._objects: Dict[Any, Dict[str, Any]] = {}
+        # 图层变化回调 on_change(obj_id, grid_rect)，只传递发生变化的栅格矩形 (x0, x1, y0, y1)，
+        # 供渲染器等下游做增量更新；未设置时不产生任何开销
+        self.on_change: Optional[Callable[[Any, Tuple[int, int, int, int]], None]] = None
 
         self._init_empty_layers()
         self._populate_initial_objects(initial_objects)
 
+        # 初始状态快照，供 reset('initial') 直接拷贝恢复
+        self._initial_stack_snapshots = [stack.copy() for stack, _, _ in self._layer_stacks]
+        self._initial_objects_state = copy.deepcopy(self._objects)
+
     def reset(self, mode: str = 'full') -> None:
         """
         重置地图状态。
@@ -57,13 +86,21 @@ class LayeredGridMap:
             raise ValueError("mode 必须是 'initial' 或 'full' 之一。")
 
         if mode == 'initial':
-            # 使用保存的原始配置重新初始化
-            self.__init__(self._original_config)
+            # 从初始快照拷贝图层数据，部件矩形为不可变元组，只需复制外层容器
+            for (stack, _, _), snapshot in zip(self._layer_stacks, self._initial_stack_snapshots):
+                np.copyto(stack, snapshot)
+            self._objects = {
+                obj_id: {**info, 'parts': dict(info['parts'])}
+                for obj_id, info in self._initial_objects_state.items()
+            }
         else:  # full reset
             self._objects.clear()
             self.layers.clear()
             self._init_empty_layers()
 
+        if self.on_change is not None:
+            self.on_change(None, (0, self.width_in_cells - 1, 0, self.height_in_cells - 1))
+
     # --- 核心 CRUD API ---
 
     def add_object(self, obj_id: Any, parts_shapes: Dict[str, Dict], layer_type: str) -> None:
@@ -77,18 +114,11 @@ class LayeredGridMap:
             parts_shapes (Dict[str, Dict]): 描述对象各个部件形状的字典。
             layer_type (str): 对象所属的物理图层类型 ('static' 或 'dynamic')。
         """
-        if obj_id in self._objects:
-            raise ValueError(f"ID为 '{obj_id}' 的对象已存在。")
-        if layer_type not in ['static', 'dynamic']:
-            raise ValueError(f"layer_type 必须是 'static' 或 'dynamic'。")
-
-        sid = obj_id
-        self._objects[obj_id] = {'semantic_id': sid, 'layer_type': layer_type, 'parts': {}}
-
-        for part_name, shape in parts_shapes.items():
-            grid_rect = self._world_to_grid_rect(shape)
-            self._draw_footprint(grid_rect, sid, layer_type)
-            self._objects[obj_id]['parts'][part_name] = grid_rect
+        grid_rects = {
+            part_name: self._world_to_grid_rect(shape)
+            for part_name, shape in parts_shapes.items()
+        }
+        self._insert_object(obj_id, grid_rects, layer_type)
 
     def delete_object(self, obj_id: Any) -> None:
         """
@@ -108,6 +138,10 @@ class LayeredGridMap:
 
         del self._objects[obj_id]
 
+        if self.on_change is not None:
+            for grid_rect in obj_info['parts'].values():
+                self.on_change(obj_id, grid_rect)
+
     def update_object_part(self, obj_id: Any, part_name: str, new_shape: Dict) -> None:
         """
         更新对象某个特定部件的形状和位置。
@@ -136,8 +170,24 @@ class LayeredGridMap:
         self._draw_footprint(new_grid_rect, sid, layer_type)
         obj_info['parts'][part_name] = new_grid_rect
 
+        if self.on_change is not None:
+            self.on_change(obj_id, old_grid_rect)
+            self.on_change(obj_id, new_grid_rect)
+
     # --- 查询 (Read) API ---
 
+    def contains(self, obj_id: Any) -> bool:
+        """
+        检查对象是否已在地图上。
+
+        Args:
+            obj_id (Any): 对象的ID。
+
+        Returns:
+            bool: 对象存在时为 True。
+        """
+        return obj_id in self._objects
+
     def get_object_info(self, obj_id: Any) -> Dict:
         """
         获取一个对象的全部元数据，包括其语义ID、图层类型和所有部件的栅格坐标。
@@ -163,9 +213,12 @@ class LayeredGridMap:
             Dict[str, Any]: 键为图层名，值为该点对应值的字典。
         """
         gx, gy = self._world_to_grid(world_pos)
-        return {name: layer[gy, gx] for name, layer in self.layers.items()}
+        result = {name: layer[gy, gx] for name, layer in self.layers.items()}
+        if self._semantic_layer is not None:
+            result['semantic'] = self._semantic_ids()[result['semantic']]
+        return result
 
-    def query_local_region(self, center: List[float], size: int) -> Dict[str, np.ndarray]:
+    def query_local_region(self, center: List[float], size: int, copy: bool = True) -> Dict[str, np.ndarray]:
         """
         查询以指定世界坐标为中心的方形区域内的所有图层数据。
 
@@ -174,62 +227,214 @@ class LayeredGridMap:
         Args:
             center (List[float]): 中心点的世界坐标 [x, y]。
             size (int): 正方形区域的边长（以栅格为单位）。
+            copy (bool, optional): 为 False 且区域完全在地图内时返回图层的只读视图而非拷贝。
+                视图与地图共享内存，会随之后的增删改同步变化，调用方如需保留结果应自行拷贝。
 
         Returns:
             Dict[str, np.ndarray]: 键为图层名，值为该区域数据的Numpy数组字典。
         """
         cx, cy = self._world_to_grid(center)
         half = size // 2
-        region_data: Dict[str, np.ndarray] = {}
-
-        for name, layer in self.layers.items():
-            x0_src, x1_src = max(0, cx - half), min(self.width_in_cells, cx + half + 1)
-            y0_src, y1_src = max(0, cy - half), min(self.height_in_cells, cy + half + 1)
-            window = layer[y0_src:y1_src, x0_src:x1_src]
-
-            init_val = self.layers_config[name]['initial_value']
-            canvas = np.full((size, size), init_val, dtype=layer.dtype)
-
-            dx_dest, dy_dest = x0_src - (cx - half), y0_src - (cy - half)
-            canvas[dy_dest: dy_dest + window.shape[0], dx_dest: dx_dest + window.shape[1]] = window
-            region_data[name] = canvas
+        x_start, y_start = cx - half, cy - half
+        x_end, y_end = x_start + size, y_start + size
+
+        if x_start >= 0 and y_start >= 0 and x_end <= self.width_in_cells and y_end <= self.height_in_cells:
+            # 区域完全在地图内（常见情况）：直接返回切片，无需填充
+            if not copy:
+                region_data: Dict[str, np.ndarray] = {}
+                for name, layer in self.layers.items():
+                    view = layer[y_start:y_end, x_start:x_end]
+                    if name == 'semantic':
+                        # 语义层需要把内部索引转换回对象ID，只能返回新数组
+                        view = self._semantic_ids()[view]
+                    view.flags.writeable = False
+                    region_data[name] = view
+                return region_data
+            blocks = [stack[:, y_start:y_end, x_start:x_end].copy() for stack, _, _ in self._layer_stacks]
+            return self._assemble_region(blocks)
+
+        x0_src, x1_src = max(0, x_start), min(self.width_in_cells, x_end)
+        y0_src, y1_src = max(0, y_start), min(self.height_in_cells, y_end)
+        dx_dest, dy_dest = x0_src - x_start, y0_src - y_start
+        h, w = y1_src - y0_src, x1_src - x0_src
+
+        # 每个dtype分组只需一次分配和一次切片拷贝
+        canvases = []
+        for stack, init_vals, names in self._layer_stacks:
+            canvas = np.empty((len(names), size, size), dtype=stack.dtype)
+            canvas[...] = init_vals
+            canvas[:, dy_dest:dy_dest + h, dx_dest:dx_dest + w] = stack[:, y0_src:y1_src, x0_src:x1_src]
+            canvases.append(canvas)
+        return self._assemble_region(canvases)
+
+    def _assemble_region(self, blocks: List[np.ndarray]) -> Dict[str, np.ndarray]:
+        """将按dtype分组截取的区域数据组装为按图层名的字典，并把语义索引转换回对象ID。"""
+        region_data = {name: blocks[k][i] for name, k, i in self._layer_order}
+        if self._semantic_layer is not None:
+            region_data['semantic'] = self._semantic_ids()[region_data['semantic']]
         return region_data
 
     # --- 内部辅助方法 ---
 
     def _init_empty_layers(self) -> None:
-        """根据图层配置初始化所有图层为空白状态。"""
+        """根据图层配置初始化所有图层为空白状态。
+
+        相同dtype的图层分配在同一个 (K, H, W) 数组中，以便一次性清除或截取所有图层。
+        """
+        groups: Dict[np.dtype, List[str]] = {}
         for layer_name, layer_cfg in self.layers_config.items():
             if 'initial_value' not in layer_cfg or 'dtype' not in layer_cfg:
                 raise ValueError(f"图层 '{layer_name}' 的配置必须包含 'initial_value' 和 'dtype'。")
-            init_val = layer_cfg['initial_value']
-            dtype = layer_cfg['dtype']
-            self.layers[layer_name] = np.full((self.height_in_cells, self.width_in_cells), init_val, dtype=dtype)
+            if layer_name == 'semantic':
+                self._init_semantic_ids(np.dtype(layer_cfg['dtype']), layer_cfg['initial_value'])
+                groups.setdefault(_SEMANTIC_INDEX_DTYPE, []).append(layer_name)
+            else:
+                groups.setdefault(np.dtype(layer_cfg['dtype']), []).append(layer_name)
+
+        slots: Dict[str, Tuple[int, int]] = {}
+        self._layer_stacks = []
+        for k, (dtype, names) in enumerate(groups.items()):
+            init_vals = np.array(
+                [0 if name == 'semantic' else self.layers_config[name]['initial_value'] for name in names],
+                dtype=dtype
+            )[:, None, None]
+            shape = (len(names), self.height_in_cells, self.width_in_cells)
+            if init_vals.any():
+                stack = np.empty(shape, dtype=dtype)
+                stack[...] = init_vals
+            else:
+                # 初始值全为0时用np.zeros分配，由操作系统提供清零页面，无需逐元素写入
+                stack = np.zeros(shape, dtype=dtype)
+            self._layer_stacks.append((stack, init_vals, names))
+            for i, name in enumerate(names):
+                slots[name] = (k, i)
+
+        # 保持与配置一致的图层顺序
+        self._layer_order = []
+        for layer_name, layer_cfg in self.layers_config.items():
+            k, i = slots[layer_name]
+            self._layer_order.append((layer_name, k, i))
+            self.layers[layer_name] = self._layer_stacks[k][0][i]
+            self._fill_vals[layer_name] = layer_cfg.get('fill_value', 1)
+        self._semantic_layer = self.layers.get('semantic')
 
     def _populate_initial_objects(self, initial_objects: List[Dict[str, Any]]) -> None:
-        """遍历初始对象列表并将它们添加到地图中。"""
-        if not initial_objects:
-            return
-        for obj_data in initial_objects:
+        """将初始对象列表添加到地图中。"""
+        if initial_objects:
+            self.add_objects(initial_objects)
+
+    def add_objects(self, objects: List[Dict[str, Any]]) -> None:
+        """
+        批量新增对象，所有部件的坐标一次性转换，足迹按图层一次性绘制。
+
+        缺少 'obj_id'、'parts_shapes' 或 'layer_type' 的条目会被跳过。任一对象校验失败时
+        不会修改地图。设置了 on_change 时只通知一次，矩形为所有变化区域的外包矩形。
+
+        Args:
+            objects (List[Dict[str, Any]]): 对象描述列表，格式与配置中的 'initial_objects' 相同。
+        """
+        valid_objects = []
+        shapes = []
+        batch_ids = set()
+        for obj_data in objects:
             obj_id = obj_data.get('obj_id')
             parts = obj_data.get('parts_shapes')
             layer_type = obj_data.get('layer_type')
             if all((obj_id, parts, layer_type)):
-                self.add_object(obj_id, parts, layer_type)
+                self._validate_new_object(obj_id, layer_type)
+                if obj_id in batch_ids:
+                    raise ValueError(f"ID为 '{obj_id}' 的对象已存在。")
+                batch_ids.add(obj_id)
+                valid_objects.append((obj_id, parts, layer_type))
+                for shape in parts.values():
+                    self._check_rectangle(shape)
+                    shapes.append(shape)
+        if not shapes:
+            return
+
+        corners = np.array(
+            [(*shape['min_corner'], *shape['max_corner']) for shape in shapes], dtype=float
+        ).reshape(-1, 2)
+        grid = self._world_to_grid_batch(corners).reshape(-1, 2, 2)
+        rects = np.stack([
+            grid[:, :, 0].min(axis=1), grid[:, :, 0].max(axis=1),
+            grid[:, :, 1].min(axis=1), grid[:, :, 1].max(axis=1)
+        ], axis=1).tolist()
+
+        # 先登记所有对象，再按图层一次性绘制全部足迹
+        rect_iter = iter(rects)
+        rect_layers: List[str] = []
+        sids: List[Any] = []
+        for obj_id, parts, layer_type in valid_objects:
+            grid_rects = {part_name: tuple(next(rect_iter)) for part_name in parts}
+            self._register_object(obj_id, grid_rects, layer_type)
+            rect_layers.extend([layer_type] * len(grid_rects))
+            sids.extend([obj_id] * len(grid_rects))
+
+        rect_array = np.asarray(rects, dtype=np.intp).reshape(-1, 4)
+        rect_layers_array = np.asarray(rect_layers)
+        for layer_type in dict.fromkeys(rect_layers):
+            layer = self.layers.get(layer_type)
+            if layer is None:
+                continue
+            layer_rects = np.ascontiguousarray(rect_array[rect_layers_array == layer_type])
+            fills = np.full(len(layer_rects), self._fill_vals[layer_type], dtype=layer.dtype)
+            fill_rects(layer, layer_rects, fills)
+        if self._semantic_layer is not None:
+            sid_indices = np.fromiter((self._intern_sid(sid) for sid in sids), dtype=_SEMANTIC_INDEX_DTYPE, count=len(sids))
+            fill_rects(self._semantic_layer, rect_array, sid_indices)
+
+        if self.on_change is not None:
+            self.on_change(None, (
+                int(rect_array[:, 0].min()), int(rect_array[:, 1].max()),
+                int(rect_array[:, 2].min()), int(rect_array[:, 3].max())
+            ))
+
+    def _insert_object(self, obj_id: Any, grid_rects: Dict[str, Tuple[int, int, int, int]], layer_type: str) -> None:
+        """登记一个部件坐标已转换为栅格矩形的对象，并绘制其足迹。"""
+        self._register_object(obj_id, grid_rects, layer_type)
+        for grid_rect in grid_rects.values():
+            self._draw_footprint(grid_rect, obj_id, layer_type)
+
+        if self.on_change is not None:
+            for grid_rect in grid_rects.values():
+                self.on_change(obj_id, grid_rect)
+
+    def _validate_new_object(self, obj_id: Any, layer_type: str) -> None:
+        """检查对象ID未被占用且图层类型合法。"""
+        if obj_id in self._objects:
+            raise ValueError(f"ID为 '{obj_id}' 的对象已存在。")
+        if layer_type not in ['static', 'dynamic']:
+            raise ValueError(f"layer_type 必须是 'static' 或 'dynamic'。")
+
+    def _register_object(self, obj_id: Any, grid_rects: Dict[str, Tuple[int, int, int, int]], layer_type: str) -> None:
+        """校验并登记一个对象的元数据，不绘制足迹。"""
+        self._validate_new_object(obj_id, layer_type)
+        self._objects[obj_id] = {'semantic_id': obj_id, 'layer_type': layer_type, 'parts': dict(grid_rects)}
 
     def _world_to_grid(self, world_coords: List[float]) -> Tuple[int, int]:
         """将单个世界坐标点 (x, y) 转换为栅格索引 (gx, gy)。"""
         x_w, y_w = world_coords
-        x_g = int((x_w - self.bounds['x_min']) / self.resolution)
-        y_g = int((y_w - self.bounds['y_min']) / self.resolution)
-        x_g = np.clip(x_g, 0, self.width_in_cells - 1)
-        y_g = np.clip(y_g, 0, self.height_in_cells - 1)
+        x_g = min(max(int((x_w - self._x_min) / self.resolution), 0), self.width_in_cells - 1)
+        y_g = min(max(int((y_w - self._y_min) / self.resolution), 0), self.height_in_cells - 1)
         return x_g, y_g
 
-    def _world_to_grid_rect(self, shape: Dict[str, Any]) -> Tuple[int, int, int, int]:
-        """将世界坐标下的矩形区域转换为栅格索引表示的矩形。"""
+    def _world_to_grid_batch(self, points: np.ndarray) -> np.ndarray:
+        """将 (N, 2) 的世界坐标数组批量转换为栅格索引数组。"""
+        grid = np.floor((points - self._origin) / self.resolution).astype(np.intp, copy=False)
+        np.clip(grid[:, 0], 0, self.width_in_cells - 1, out=grid[:, 0])
+        np.clip(grid[:, 1], 0, self.height_in_cells - 1, out=grid[:, 1])
+        return grid
+
+    @staticmethod
+    def _check_rectangle(shape: Dict[str, Any]) -> None:
+        """检查形状是否为当前支持的矩形。"""
         if shape.get('type') != 'rectangle':
             raise NotImplementedError("目前仅支持 'rectangle' 形状。")
+
+    def _world_to_grid_rect(self, shape: Dict[str, Any]) -> Tuple[int, int, int, int]:
+        """将世界坐标下的矩形区域转换为栅格索引表示的矩形。"""
+        self._check_rectangle(shape)
         min_c, max_c = shape['min_corner'], shape['max_corner']
         x0, y0 = self._world_to_grid(min_c)
         x1, y1 = self._world_to_grid(max_c)
@@ -238,15 +443,49 @@ class LayeredGridMap:
     def _clear_footprint(self, grid_rect: Tuple[int, int, int, int]):
         """将指定栅格区域在所有图层上的数据恢复为其配置的初始值。"""
         x0, x1, y0, y1 = grid_rect
-        for name, layer_cfg in self.layers_config.items():
-            init_val = layer_cfg['initial_value']
-            self.layers[name][y0:y1 + 1, x0:x1 + 1] = init_val
+        if x0 == 0 and y0 == 0 and x1 == self.width_in_cells - 1 and y1 == self.height_in_cells - 1:
+            # 覆盖整张地图时逐层直接填充，省去切片索引
+            for stack, init_vals, _ in self._layer_stacks:
+                for layer, init_val in zip(stack, init_vals.ravel()):
+                    layer.fill(init_val)
+            return
+        for stack, init_vals, _ in self._layer_stacks:
+            stack[:, y0:y1 + 1, x0:x1 + 1] = init_vals
 
     def _draw_footprint(self, grid_rect: Tuple[int, int, int, int], semantic_id: Any, layer_type: str):
         """根据 layer_type 在物理层和语义层上“绘制”指定的栅格区域。"""
         x0, x1, y0, y1 = grid_rect
-        if layer_type in self.layers:
-            fill_val = self.layers_config[layer_type].get('fill_value', 1)
-            self.layers[layer_type][y0:y1 + 1, x0:x1 + 1] = fill_val
-        if 'semantic' in self.layers:
-            self.layers['semantic'][y0:y1 + 1, x0:x1 + 1] = semantic_id
\ No newline at end of file
+        layer = self.layers.get(layer_type)
+        if layer is not None:
+            layer[y0:y1 + 1, x0:x1 + 1] = self._fill_vals[layer_type]
+        if self._semantic_layer is not None:
+            self._semantic_layer[y0:y1 + 1, x0:x1 + 1] = self._intern_sid(semantic_id)
+
+    def _init_semantic_ids(self, dtype: np.dtype, initial_value: Any) -> None:
+        """初始化语义ID驻留表，索引0对应语义层配置的初始值。已有的驻留记录保持不变。"""
+        self._semantic_dtype = dtype
+        if not self._idx_to_sid:
+            self._idx_to_sid.append(initial_value)
+            self._sid_lookup = None
+
+    def _intern_sid(self, semantic_id: Any) -> int:
+        """返回语义ID在语义层中的索引，首次出现时分配新索引（删除对象后索引不回收）。"""
+        idx = self._sid_to_idx.get(semantic_id)
+        if idx is None:
+            idx = len(self._idx_to_sid)
+            self._sid_to_idx[semantic_id] = idx
+            self._idx_to_sid.append(semantic_id)
+            self._sid_lookup = None
+        return idx
+
+    def _semantic_ids(self) -> np.ndarray:
+        """语义索引到对象ID的查找数组；对象ID无法用配置的dtype表示时退化为object数组。"""
+        if self._sid_lookup is None:
+            try:
+                self._sid_lookup = np.array(self._idx_to_sid, dtype=self._semantic_dtype)
+            except (TypeError, ValueError, OverflowError):
+                lookup = np.empty(len(self._idx_to_sid), dtype=object)
+                for i, sid in enumerate(self._idx_to_sid):
+                    lookup[i] = sid
+                self._sid_lookup = lookup
+        return self._sid_lookup
\ No newline at end of file
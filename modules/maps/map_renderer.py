@@ -7,6 +7,7 @@
 """
 
 import asyncio
+import collections
 import time
 import numpy as np
 import networkx as nx
@@ -14,23 +15,131 @@ from matplotlib import pyplot as plt
 from typing import Dict, Any, List, Tuple, Optional
 from dataclasses import dataclass
 from enum import Enum
+from types import MappingProxyType
+
+from ._layout import fruchterman_reingold
 
 # PyQt6 imports for modern async UI
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
     QLabel, QFrame, QGraphicsView, QGraphicsScene, QGraphicsItem,
     QGraphicsRectItem, QGraphicsEllipseItem, QGraphicsTextItem,
-    QGraphicsLineItem, QGraphicsPolygonItem
+    QGraphicsLineItem, QGraphicsPolygonItem, QGraphicsPixmapItem,
+    QGraphicsPathItem
 )
 from PyQt6.QtCore import (
-    Qt, QTimer, QThread, pyqtSignal, QObject, QEvent, QRectF,
+    Qt, QTimer, pyqtSignal, pyqtSlot, QMetaObject, QObject, QEvent, QRectF,
     QPointF, QPropertyAnimation, QEasingCurve
 )
 from PyQt6.QtGui import (
     QPainter, QPen, QBrush, QColor, QFont, QPainterPath,
-    QLinearGradient, QRadialGradient
+    QLinearGradient, QRadialGradient, QPixmap, QPixmapCache
 )
 
+# qasync 让 Qt 事件循环同时驱动 asyncio（可选）
+try:
+    import qasync
+    QASYNC_AVAILABLE = True
+except ImportError:
+    qasync = None
+    QASYNC_AVAILABLE = False
+
+
+def _circle_sprite(brush: QBrush, diameter: float, pen: QPen) -> QPixmap:
+    """
+    获取预先光栅化的圆形精灵图，相同 (颜色, 直径, 描边宽度) 的圆共享同一张 QPixmap。
+
+    精灵图四周留出与描边宽度相同的边距，放置时需将位置偏移该边距。
+    """
+    size = max(1, int(round(diameter)))
+    margin = pen.width()
+    key = f"sgi_circle:{brush.color().name()}:{size}:{margin}"
+    pixmap = QPixmapCache.find(key)
+    if pixmap is None:
+        pixmap = QPixmap(size + 2 * margin, size + 2 * margin)
+        pixmap.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing, True)
+        painter.setBrush(brush)
+        painter.setPen(pen)
+        painter.drawEllipse(QRectF(margin, margin, size, size))
+        painter.end()
+        QPixmapCache.insert(key, pixmap)
+    return pixmap
+
+
+_EMPTY_MAPPING = MappingProxyType({})
+
+
+def _scene_accessor(task_context: "TaskContext"):
+    """
+    为 TaskContext 生成读取场景 (nodes, edges) 的函数，读取方式只在构造时判断一次。
+
+    上下文提供 get_scene_nodes/get_scene_edges 时直接使用，否则从
+    get_config()['environment']['scene_config'] 中读取，缺失的层级不会创建临时字典。
+    """
+    if hasattr(task_context, 'get_scene_nodes') and hasattr(task_context, 'get_scene_edges'):
+        get_nodes = task_context.get_scene_nodes
+        get_edges = task_context.get_scene_edges
+        return lambda: (get_nodes(), get_edges())
+    
+    get_config = task_context.get_config
+    
+    def read_scene():
+        environment = get_config().get('environment') or _EMPTY_MAPPING
+        scene_config = environment.get('scene_config') or _EMPTY_MAPPING
+        return scene_config.get('nodes') or [], scene_config.get('edges') or []
+    
+    return read_scene
+
+
+# 一次重绘新增的图形项达到该数量时，暂停场景的 BSP 索引后批量加入
+_BULK_INSERT_THRESHOLD = 64
+
+
+def _add_items_bulk(scene: QGraphicsScene, items: List[QGraphicsItem]) -> None:
+    """
+    将图形项批量加入场景并清空列表。
+
+    数量较多时先切换为 NoIndex，全部加入后再恢复 BspTreeIndex，
+    索引只重建一次，而不是每加入一项就插入并失效一次。
+    """
+    if len(items) >= _BULK_INSERT_THRESHOLD:
+        scene.setItemIndexMethod(QGraphicsScene.ItemIndexMethod.NoIndex)
+        for item in items:
+            scene.addItem(item)
+        scene.setItemIndexMethod(QGraphicsScene.ItemIndexMethod.BspTreeIndex)
+    else:
+        for item in items:
+            scene.addItem(item)
+    items.clear()
+
+
+def _configure_viewport(view: QGraphicsView, use_opengl: bool) -> None:
+    """
+    设置视图的视口。
+
+    启用 OpenGL 时以 QOpenGLWidget 作为视口，由 GPU 完成场景合成；GL 视口必须整体重绘，
+    否则只重绘变化区域。当前环境缺少 QtOpenGLWidgets 时退回光栅视口。
+    """
+    if use_opengl:
+        try:
+            from PyQt6.QtOpenGLWidgets import QOpenGLWidget
+            from PyQt6.QtGui import QSurfaceFormat
+        except ImportError:
+            use_opengl = False
+    
+    if use_opengl:
+        gl_widget = QOpenGLWidget()
+        surface_format = QSurfaceFormat()
+        surface_format.setSamples(4)
+        gl_widget.setFormat(surface_format)
+        view.setViewport(gl_widget)
+        view.setViewportUpdateMode(QGraphicsView.ViewportUpdateMode.FullViewportUpdate)
+    else:
+        # 只重绘变化图形项的包围区域
+        view.setViewportUpdateMode(QGraphicsView.ViewportUpdateMode.MinimalViewportUpdate)
+
 
 class RenderEvent(Enum):
     """渲染事件类型"""
@@ -43,7 +152,11 @@ class RenderEvent(Enum):
     HIGHLIGHT_OBJECT = "highlight_object"
 
 
-@dataclass
+# 只影响关系图的事件；其余非高亮事件需要重绘两个视图
+_RELATION_EVENTS = frozenset((RenderEvent.RELATION_ADDED, RenderEvent.RELATION_REMOVED, RenderEvent.RELATION_UPDATED))
+
+
+@dataclass(slots=True)
 class RenderMessage:
     """渲染消息数据结构"""
     event_type: RenderEvent
@@ -57,53 +170,89 @@ class RenderMessage:
 
 
 class AsyncRenderWorker(QObject):
-    """异步渲染工作线程"""
+    """
+    渲染消息分发器。
+
+    任意线程都可以投递消息：消息追加到 deque（append/popleft 线程安全），再通过排队调用
+    在 GUI 线程上批量取出并发送，不依赖 asyncio 事件循环。
+    """
     
     render_signal = pyqtSignal(RenderMessage)
     
     def __init__(self):
         super().__init__()
         self._running = False
-        self._message_queue = asyncio.Queue()
+        self._message_queue = collections.deque()
+        self._drain_scheduled = False
         
     def start(self):
-        """启动渲染工作线程"""
+        """开始分发消息"""
         self._running = True
-        asyncio.create_task(self._process_messages())
         
     def stop(self):
-        """停止渲染工作线程"""
+        """停止分发消息并丢弃尚未处理的消息"""
         self._running = False
+        self._message_queue.clear()
+        
+    def post_message(self, message: RenderMessage):
+        """发送渲染消息，可在任意线程调用"""
+        self._message_queue.append(message)
+        # 已有排队中的取出调用时不再重复排队
+        if not self._drain_scheduled:
+            self._drain_scheduled = True
+            QMetaObject.invokeMethod(self, "_drain", Qt.ConnectionType.QueuedConnection)
+        
+    @pyqtSlot()
+    def _drain(self):
+        """
+        在 GUI 线程上取出全部积压消息并合并后发送。
+
+        更新类消息只用于标记视图需要重绘，两条高亮消息之间的关系类和其他类消息各保留最后一条，
+        分别对应关系图和两个视图的重绘；高亮消息保持原有顺序。
+        """
+        # 先清除标志再取消息，取出期间新投递的消息会重新排队
+        self._drain_scheduled = False
+        if not self._running:
+            return
         
-    async def post_message(self, message: RenderMessage):
-        """发送渲染消息"""
-        await self._message_queue.put(message)
-        
-    async def _process_messages(self):
-        """处理渲染消息"""
-        while self._running:
-            try:
-                # 等待消息
-                message = await asyncio.wait_for(self._message_queue.get(), timeout=0.1)
-                
-                # 发送到UI线程
+        pending = []
+        slots = {}  # 是否为关系类消息 -> 在 pending 中的下标
+        try:
+            while True:
+                message = self._message_queue.popleft()
+                if message.event_type == RenderEvent.HIGHLIGHT_OBJECT:
+                    pending.append(message)
+                    slots.clear()
+                    continue
+                is_relation = message.event_type in _RELATION_EVENTS
+                index = slots.get(is_relation)
+                if index is None:
+                    slots[is_relation] = len(pending)
+                    pending.append(message)
+                else:
+                    pending[index] = message
+        except IndexError:
+            pass
+        
+        try:
+            for message in pending:
                 self.render_signal.emit(message)
-                
-            except asyncio.TimeoutError:
-                continue
-            except Exception as e:
-                print(f"Error processing render message: {e}")
+        except Exception as e:
+            print(f"Error processing render message: {e}")
 
 
 class SpatialMapView(QGraphicsView):
     """2D物理空间地图视图"""
     
-    def __init__(self, task_context: "TaskContext", template_library: "EntityTemplateLibrary"):
+    def __init__(self, task_context: "TaskContext", template_library: "EntityTemplateLibrary",
+                 use_opengl: bool = False):
         # 确保QApplication存在
         self._ensure_qapplication()
         super().__init__()
         self.task_context = task_context
         self.template_lib = template_library
+        self._use_opengl = use_opengl
+        self._read_scene = _scene_accessor(task_context)
         self.highlighted_objects = set()
         
         # 初始化视图
@@ -126,7 +275,9 @@ class SpatialMapView(QGraphicsView):
         """设置视图属性"""
         # 设置视图属性
         self.setRenderHint(QPainter.RenderHint.Antialiasing, True)
-        self.setViewportUpdateMode(QGraphicsView.ViewportUpdateMode.FullViewportUpdate)
+        _configure_viewport(self, self._use_opengl)
+        self.setOptimizationFlag(QGraphicsView.OptimizationFlag.DontSavePainterState, True)
+        self.setOptimizationFlag(QGraphicsView.OptimizationFlag.DontAdjustForAntialiasing, True)
         self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
         self.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
         
@@ -136,7 +287,15 @@ class SpatialMapView(QGraphicsView):
         
         # 颜色映射
         self._colors = self._generate_color_map()
-        self._object_items = {}  # 存储图形项引用
+        self._object_items = {}  # obj_id -> (图形项, 文本项, 外观签名)
+        self._pending_items = []  # 本次重绘新建、尚未加入场景的图形项
+        
+        # 预先创建画刷和画笔，绘制时直接复用
+        self._brushes = {key: QBrush(color) for key, color in self._colors.items()}
+        self._default_brush = QBrush(QColor(128, 128, 128))
+        self._black_pen_1 = QPen(QColor(0, 0, 0), 1)
+        self._highlight_pen = QPen(QColor(255, 255, 0), 3)  # 黄色高亮
+        self._text_color = QColor(0, 0, 0)
         
         # 设置场景边界
         self.scene.setSceneRect(-1000, -1000, 2000, 2000)
@@ -156,21 +315,78 @@ class SpatialMapView(QGraphicsView):
             'security_breach': QColor(255, 0, 255)
         }
         
-    def redraw(self):
-        """重新绘制地图"""
-        self.scene.clear()
-        self._object_items.clear()
+    def _brush_for(self, obj_type, category):
+        """按类型、类别的优先级取缓存的画刷；类型已知时只查一次字典"""
+        brush = self._brushes.get(obj_type)
+        if brush is None:
+            brush = self._brushes.get(category, self._default_brush)
+        return brush
+        
+    def redraw(self, nodes=None):
+        """
+        增量重绘地图：只增删或更新发生变化的对象，未变化的图形项保持不动。
+        
+        Args:
+            nodes: 已解析的场景节点列表；为 None 时从 TaskContext 读取
+        """
+        # 高亮只保留到下一次重绘
+        for obj_id in self.highlighted_objects:
+            if obj_id in self._object_items:
+                self._object_items[obj_id][0].setPen(self._black_pen_1)
+        self.highlighted_objects.clear()
         
         # 从 TaskContext 获取所有对象
-        config = self.task_context.get_config()
-        environment = config.get('environment', {})
-        scene_config = environment.get('scene_config', {})
-        nodes = scene_config.get('nodes', [])
+        if nodes is None:
+            nodes, _ = self._read_scene()
+        new_nodes = {node.get('id'): node for node in nodes}
+        
+        # 删除已不存在的对象
+        for obj_id in self._object_items.keys() - new_nodes.keys():
+            self._remove_object(obj_id)
+            
+        for obj_id, node in new_nodes.items():
+            signature = self._node_signature(node)
+            entry = self._object_items.get(obj_id)
+            if entry is not None:
+                if entry[2] == signature:
+                    continue
+                # 形状类型不变时原地修改图形项，否则删除后重建
+                if signature is not None and entry[2][0] == signature[0]:
+                    self._update_object(obj_id, signature)
+                    continue
+                self._remove_object(obj_id)
+            self._draw_object(node, signature)
+            
+        _add_items_bulk(self.scene, self._pending_items)
+            
+    @staticmethod
+    def _node_signature(node_data):
+        """
+        提取决定对象外观的字段：(形状类型, (x, y, 宽, 高), 类型, 类别, 标签)。
+        无法绘制的对象返回 None。
+        """
+        shape = node_data.get('shape')
+        if not shape:
+            return None
+        
+        shape_type = shape.get('type')
+        if shape_type == 'rectangle':
+            min_corner = shape.get('min_corner', [0, 0])
+            max_corner = shape.get('max_corner', [10, 10])
+            geometry = (min_corner[0], min_corner[1],
+                        max_corner[0] - min_corner[0], max_corner[1] - min_corner[1])
+        elif shape_type == 'circle':
+            center = shape.get('center', [0, 0])
+            radius = shape.get('radius', 5)
+            geometry = (center[0] - radius, center[1] - radius, radius * 2, radius * 2)
+        else:
+            return None
         
-        for node in nodes:
-            self._draw_object(node)
+        properties = node_data.get('properties', {})
+        return (shape_type, geometry, properties.get('type', 'unknown'),
+                properties.get('category', 'unknown'), properties.get('label', str(node_data.get('id'))))
             
-    def _draw_object(self, node_data):
+    def _draw_object(self, node_data, signature=None):
         """绘制单个对象"""
         obj_id = node_data.get('id')
         properties = node_data.get('properties', {})
@@ -178,21 +394,59 @@ class SpatialMapView(QGraphicsView):
         
         if not shape:
             return
+        if signature is None:
+            signature = self._node_signature(node_data)
             
         # 获取对象类型和颜色
         obj_type = properties.get('type', 'unknown')
         category = properties.get('category', 'unknown')
         
-        # 确定颜色
-        color = self._colors.get(obj_type, self._colors.get(category, QColor(128, 128, 128)))
+        # 确定画刷
+        brush = self._brush_for(obj_type, category)
         
         # 绘制形状
         if shape.get('type') == 'rectangle':
-            self._draw_rectangle(obj_id, shape, color, properties)
+            self._draw_rectangle(obj_id, shape, brush, properties)
         elif shape.get('type') == 'circle':
-            self._draw_circle(obj_id, shape, color, properties)
+            self._draw_circle(obj_id, shape, brush, properties)
+        else:
+            return
+        
+        item, text_item = self._object_items[obj_id]
+        self._object_items[obj_id] = (item, text_item, signature)
+            
+    def _update_object(self, obj_id, signature):
+        """按签名差异原地更新已有的图形项"""
+        item, text_item, old_signature = self._object_items[obj_id]
+        _, geometry, obj_type, category, label = signature
+        geometry_changed = geometry != old_signature[1]
+        brush_changed = (obj_type, category) != old_signature[2:4]
+        x, y, width, height = geometry
+        
+        if isinstance(item, QGraphicsPixmapItem):
+            # 精灵图：换用对应的缓存图片
+            if geometry_changed or brush_changed:
+                item.setPixmap(_circle_sprite(self._brush_for(obj_type, category), width, self._black_pen_1))
+                item.setPos(x - self._black_pen_1.width(), y - self._black_pen_1.width())
+        else:
+            if geometry_changed:
+                item.setRect(x, y, width, height)
+            if brush_changed:
+                item.setBrush(self._brush_for(obj_type, category))
+        if geometry_changed:
+            text_item.setPos(x, y - 20)
+        if label != old_signature[4]:
+            text_item.setPlainText(label)
+            
+        self._object_items[obj_id] = (item, text_item, signature)
+        
+    def _remove_object(self, obj_id):
+        """从场景中移除对象的图形项"""
+        item, text_item, _ = self._object_items.pop(obj_id)
+        self.scene.removeItem(item)
+        self.scene.removeItem(text_item)
             
-    def _draw_rectangle(self, obj_id, shape, color, properties):
+    def _draw_rectangle(self, obj_id, shape, brush, properties):
         """绘制矩形对象"""
         min_corner = shape.get('min_corner', [0, 0])
         max_corner = shape.get('max_corner', [10, 10])
@@ -204,23 +458,25 @@ class SpatialMapView(QGraphicsView):
         
         # 创建矩形项
         rect_item = QGraphicsRectItem(x, y, width, height)
-        rect_item.setBrush(QBrush(color))
-        rect_item.setPen(QPen(QColor(0, 0, 0), 1))
+        rect_item.setBrush(brush)
+        rect_item.setPen(self._black_pen_1)
         
         # 添加标签
         label = properties.get('label', str(obj_id))
         text_item = QGraphicsTextItem(label)
         text_item.setPos(x, y - 20)
-        text_item.setDefaultTextColor(QColor(0, 0, 0))
+        text_item.setDefaultTextColor(self._text_color)
+        # 标签很少变化，缓存光栅化结果，避免每次绘制重新排版
+        text_item.setCacheMode(QGraphicsItem.CacheMode.DeviceCoordinateCache)
         
-        # 添加到场景
-        self.scene.addItem(rect_item)
-        self.scene.addItem(text_item)
+        # 等待重绘结束时批量加入场景
+        self._pending_items.append(rect_item)
+        self._pending_items.append(text_item)
         
         # 保存引用
         self._object_items[obj_id] = (rect_item, text_item)
         
-    def _draw_circle(self, obj_id, shape, color, properties):
+    def _draw_circle(self, obj_id, shape, brush, properties):
         """绘制圆形对象"""
         center = shape.get('center', [0, 0])
         radius = shape.get('radius', 5)
@@ -229,20 +485,21 @@ class SpatialMapView(QGraphicsView):
         y = center[1] - radius
         diameter = radius * 2
         
-        # 创建圆形项
-        circle_item = QGraphicsEllipseItem(x, y, diameter, diameter)
-        circle_item.setBrush(QBrush(color))
-        circle_item.setPen(QPen(QColor(0, 0, 0), 1))
+        # 同类圆形共享缓存的精灵图
+        circle_item = QGraphicsPixmapItem(_circle_sprite(brush, diameter, self._black_pen_1))
+        circle_item.setPos(x - self._black_pen_1.width(), y - self._black_pen_1.width())
         
         # 添加标签
         label = properties.get('label', str(obj_id))
         text_item = QGraphicsTextItem(label)
         text_item.setPos(x, y - 20)
-        text_item.setDefaultTextColor(QColor(0, 0, 0))
+        text_item.setDefaultTextColor(self._text_color)
+        # 标签很少变化，缓存光栅化结果，避免每次绘制重新排版
+        text_item.setCacheMode(QGraphicsItem.CacheMode.DeviceCoordinateCache)
         
-        # 添加到场景
-        self.scene.addItem(circle_item)
-        self.scene.addItem(text_item)
+        # 等待重绘结束时批量加入场景
+        self._pending_items.append(circle_item)
+        self._pending_items.append(text_item)
         
         # 保存引用
         self._object_items[obj_id] = (circle_item, text_item)
@@ -250,19 +507,32 @@ class SpatialMapView(QGraphicsView):
     def highlight_object(self, obj_id):
         """高亮显示对象"""
         if obj_id in self._object_items:
-            item, text_item = self._object_items[obj_id]
-            item.setPen(QPen(QColor(255, 255, 0), 3))  # 黄色高亮
+            item, text_item, signature = self._object_items[obj_id]
+            if isinstance(item, QGraphicsPixmapItem):
+                # 精灵图无法单独描边，高亮时换回矢量圆形
+                x, y, width, height = signature[1]
+                vector_item = QGraphicsEllipseItem(x, y, width, height)
+                vector_item.setBrush(self._brush_for(signature[2], signature[3]))
+                self.scene.removeItem(item)
+                self.scene.addItem(vector_item)
+                item = vector_item
+                self._object_items[obj_id] = (item, text_item, signature)
+            item.setPen(self._highlight_pen)
+            self.highlighted_objects.add(obj_id)
 
 
 class GraphMapView(QGraphicsView):
     """逻辑关系图视图"""
     
-    def __init__(self, task_context: "TaskContext", template_library: "EntityTemplateLibrary"):
+    def __init__(self, task_context: "TaskContext", template_library: "EntityTemplateLibrary",
+                 use_opengl: bool = False):
         # 确保QApplication存在
         self._ensure_qapplication()
         super().__init__()
         self.task_context = task_context
         self.template_lib = template_library
+        self._use_opengl = use_opengl
+        self._read_scene = _scene_accessor(task_context)
         
         # 初始化视图
         self._setup_view()
@@ -284,7 +554,9 @@ class GraphMapView(QGraphicsView):
         """设置视图属性"""
         # 设置视图属性
         self.setRenderHint(QPainter.RenderHint.Antialiasing, True)
-        self.setViewportUpdateMode(QGraphicsView.ViewportUpdateMode.FullViewportUpdate)
+        _configure_viewport(self, self._use_opengl)
+        self.setOptimizationFlag(QGraphicsView.OptimizationFlag.DontSavePainterState, True)
+        self.setOptimizationFlag(QGraphicsView.OptimizationFlag.DontAdjustForAntialiasing, True)
         self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
         self.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
         
@@ -295,7 +567,23 @@ class GraphMapView(QGraphicsView):
         # 颜色映射
         self._colors = self._generate_color_map()
         self._rel_colors = {}
-        self._node_items = {}
+        
+        # 预先创建画刷和画笔，绘制时直接复用
+        self._brushes = {key: QBrush(color) for key, color in self._colors.items()}
+        self._default_brush = QBrush(QColor(128, 128, 128))
+        self._black_pen_2 = QPen(QColor(0, 0, 0), 2)
+        self._node_radius = 20
+        self._text_color = QColor(0, 0, 0)
+        self._edge_pens = {
+            'contains': QPen(QColor(0, 255, 0), 2),  # 绿色
+            'near': QPen(QColor(255, 255, 0), 2),  # 黄色
+            'default': QPen(QColor(128, 128, 128), 1)  # 灰色
+        }
+        self._node_items = {}  # node_id -> (圆形项, 文本项, 外观签名)
+        self._node_centers = {}  # node_id -> 节点中心 (x, y)
+        self._layout_key = None  # 上次布局时的 (节点ID序列, 边下标集合)
+        self._edge_path_items = {}  # 画笔样式 -> (路径项, 该路径包含的 (source, target) 集合)
+        self._pending_items = []  # 本次重绘新建、尚未加入场景的图形项
         
         # 设置场景边界
         self.scene.setSceneRect(-500, -500, 1000, 1000)
@@ -315,29 +603,100 @@ class GraphMapView(QGraphicsView):
             'security_breach': QColor(255, 0, 255)
         }
         
-    def redraw(self):
-        """重新绘制关系图"""
-        self.scene.clear()
-        self._node_items.clear()
+    def _brush_for(self, obj_type, category):
+        """按类型、类别的优先级取缓存的画刷；类型已知时只查一次字典"""
+        brush = self._brushes.get(obj_type)
+        if brush is None:
+            brush = self._brushes.get(category, self._default_brush)
+        return brush
+        
+    def redraw(self, nodes=None, edges=None):
+        """
+        增量重绘关系图：只增删或更新发生变化的节点和边。
+        
+        Args:
+            nodes: 已解析的场景节点列表；与 edges 同为 None 时从 TaskContext 读取
+            edges: 已解析的场景边列表
+        """
         self._rel_colors.clear()
         
         # 从 TaskContext 获取所有对象和关系
-        config = self.task_context.get_config()
-        environment = config.get('environment', {})
-        scene_config = environment.get('scene_config', {})
-        nodes = scene_config.get('nodes', [])
-        edges = scene_config.get('edges', [])
-        
-        # 绘制节点
-        for node in nodes:
-            self._draw_node(node)
+        if nodes is None and edges is None:
+            nodes, edges = self._read_scene()
+        nodes = nodes or []
+        edges = edges or []
+        new_nodes = {node.get('id'): node for node in nodes}
+        
+        # 删除已不存在的节点
+        for node_id in self._node_items.keys() - new_nodes.keys():
+            circle_item, text_item, _ = self._node_items.pop(node_id)
+            del self._node_centers[node_id]
+            self.scene.removeItem(circle_item)
+            self.scene.removeItem(text_item)
             
-        # 绘制边
+        # 边：两端节点都存在的才绘制，按画笔样式分组
+        node_index = {node_id: i for i, node_id in enumerate(new_nodes)}
+        edge_groups = {pen_key: set() for pen_key in self._edge_pens}
+        index_edges = []
         for edge in edges:
-            self._draw_edge(edge)
+            source = edge.get('source')
+            target = edge.get('target')
+            if source in node_index and target in node_index:
+                edge_type = edge.get('type', 'relation')
+                pen_key = edge_type if edge_type in self._edge_pens else 'default'
+                edge_groups[pen_key].add((source, target))
+                index_edges.append((node_index[source], node_index[target]))
+                
+        # 节点或边的拓扑变化时重新布局，已有节点移动到新位置
+        layout_key = (tuple(new_nodes), frozenset(index_edges))
+        relayout = layout_key != self._layout_key
+        if relayout:
+            self._layout_key = layout_key
+            pos = fruchterman_reingold(np.array(index_edges, dtype=np.int64).reshape(-1, 2), len(new_nodes))
+            xs = (pos[:, 0] * 900 - 450).tolist()
+            ys = (pos[:, 1] * 700 - 350).tolist()
+            for node_id, x, y in zip(new_nodes, xs, ys):
+                if node_id in self._node_items:
+                    self._move_node(node_id, x, y)
+                else:
+                    self._draw_node(new_nodes[node_id], x, y)
+            
+        # 更新已有节点的颜色和标签
+        for node_id, node in new_nodes.items():
+            entry = self._node_items[node_id]
+            signature = self._node_signature(node)
+            if entry[2] != signature:
+                circle_item, text_item, old_signature = entry
+                obj_type, category, label = signature
+                if (obj_type, category) != old_signature[:2]:
+                    circle_item.setPixmap(_circle_sprite(self._brush_for(obj_type, category),
+                                                         self._node_radius * 2, self._black_pen_2))
+                if label != old_signature[2]:
+                    text_item.setPlainText(label)
+                self._node_items[node_id] = (circle_item, text_item, signature)
+                
+        # 同一样式的边合并为一条路径，只有边集合变化或重新布局后才重建
+        for pen_key, edge_keys in edge_groups.items():
+            path_item, old_keys = self._edge_path_items.get(pen_key, (None, frozenset()))
+            if edge_keys == old_keys and not relayout:
+                continue
+            if path_item is not None:
+                self.scene.removeItem(path_item)
+                del self._edge_path_items[pen_key]
+            if edge_keys:
+                self._draw_edges(pen_key, frozenset(edge_keys))
+                
+        _add_items_bulk(self.scene, self._pending_items)
+                
+    @staticmethod
+    def _node_signature(node_data):
+        """提取决定节点外观的字段：(类型, 类别, 标签)"""
+        properties = node_data.get('properties', {})
+        return (properties.get('type', 'unknown'), properties.get('category', 'unknown'),
+                properties.get('label', str(node_data.get('id'))))
             
-    def _draw_node(self, node_data):
-        """绘制节点"""
+    def _draw_node(self, node_data, x, y):
+        """在 (x, y) 处绘制节点"""
         node_id = node_data.get('id')
         properties = node_data.get('properties', {})
         
@@ -345,64 +704,58 @@ class GraphMapView(QGraphicsView):
         obj_type = properties.get('type', 'unknown')
         category = properties.get('category', 'unknown')
         
-        # 确定颜色
-        color = self._colors.get(obj_type, self._colors.get(category, QColor(128, 128, 128)))
-        
-        # 计算位置（简化布局）
-        x = (hash(str(node_id)) % 20) * 50 - 500
-        y = (hash(str(node_id)) % 15) * 50 - 350
+        # 确定画刷
+        brush = self._brush_for(obj_type, category)
         
-        # 创建圆形节点
-        radius = 20
-        circle_item = QGraphicsEllipseItem(x - radius, y - radius, radius * 2, radius * 2)
-        circle_item.setBrush(QBrush(color))
-        circle_item.setPen(QPen(QColor(0, 0, 0), 2))
+        # 创建圆形节点，同类节点共享缓存的精灵图
+        radius = self._node_radius
+        margin = self._black_pen_2.width()
+        circle_item = QGraphicsPixmapItem(_circle_sprite(brush, radius * 2, self._black_pen_2))
+        circle_item.setPos(x - radius - margin, y - radius - margin)
         
         # 添加标签
         label = properties.get('label', str(node_id))
         text_item = QGraphicsTextItem(label)
         text_item.setPos(x - 30, y + radius + 5)
-        text_item.setDefaultTextColor(QColor(0, 0, 0))
+        text_item.setDefaultTextColor(self._text_color)
+        # 标签很少变化，缓存光栅化结果，避免每次绘制重新排版
+        text_item.setCacheMode(QGraphicsItem.CacheMode.DeviceCoordinateCache)
         
-        # 添加到场景
-        self.scene.addItem(circle_item)
-        self.scene.addItem(text_item)
+        # 等待重绘结束时批量加入场景
+        self._pending_items.append(circle_item)
+        self._pending_items.append(text_item)
         
         # 保存引用
-        self._node_items[node_id] = circle_item
-        
-    def _draw_edge(self, edge_data):
-        """绘制边"""
-        source = edge_data.get('source')
-        target = edge_data.get('target')
-        edge_type = edge_data.get('type', 'relation')
-        
-        if source not in self._node_items or target not in self._node_items:
-            return
-            
-        # 获取节点位置
-        source_item = self._node_items[source]
-        target_item = self._node_items[target]
-        
-        source_pos = source_item.rect().center()
-        target_pos = target_item.rect().center()
-        
-        # 创建边
-        line_item = QGraphicsLineItem(source_pos.x(), source_pos.y(), 
-                                    target_pos.x(), target_pos.y())
-        
-        # 设置边的样式
-        if edge_type == 'contains':
-            pen = QPen(QColor(0, 255, 0), 2)  # 绿色
-        elif edge_type == 'near':
-            pen = QPen(QColor(255, 255, 0), 2)  # 黄色
-        else:
-            pen = QPen(QColor(128, 128, 128), 1)  # 灰色
+        self._node_items[node_id] = (circle_item, text_item, self._node_signature(node_data))
+        self._node_centers[node_id] = (x, y)
+        
+    def _move_node(self, node_id, x, y):
+        """将已有节点及其标签移动到新的中心 (x, y)"""
+        circle_item, text_item, _ = self._node_items[node_id]
+        radius = self._node_radius
+        margin = self._black_pen_2.width()
+        circle_item.setPos(x - radius - margin, y - radius - margin)
+        text_item.setPos(x - 30, y + radius + 5)
+        self._node_centers[node_id] = (x, y)
+        
+    def _draw_edges(self, pen_key, edge_keys):
+        """将同一样式的所有边绘制为一条路径"""
+        path = QPainterPath()
+        for source, target in edge_keys:
+            sx, sy = self._node_centers[source]
+            tx, ty = self._node_centers[target]
+            path.moveTo(sx, sy)
+            path.lineTo(tx, ty)
             
-        line_item.setPen(pen)
+        # 创建路径并设置边的样式
+        path_item = QGraphicsPathItem(path)
+        path_item.setPen(self._edge_pens[pen_key])
+        
+        # 等待重绘结束时批量加入场景
+        self._pending_items.append(path_item)
         
-        # 添加到场景
-        self.scene.addItem(line_item)
+        # 保存引用
+        self._edge_path_items[pen_key] = (path_item, edge_keys)
 
 
 class MapRenderer(QMainWindow):
@@ -412,8 +765,11 @@ class MapRenderer(QMainWindow):
     基于PyQt6的实时场景可视化工具，支持异步事件处理和GPU加速渲染。
     """
     
+    # 无参数的重绘请求信号；从其他线程发出时由 Qt 排队到 GUI 线程
+    redraw_signal = pyqtSignal()
+    
     def __init__(self, task_context: "TaskContext", template_library: "EntityTemplateLibrary", 
-                 window_size: Tuple[int, int] = (1600, 900)):
+                 window_size: Tuple[int, int] = (1600, 900), use_opengl: bool = False):
         # 确保QApplication存在
         self._ensure_qapplication()
         
@@ -422,21 +778,30 @@ class MapRenderer(QMainWindow):
         self.task_context = task_context
         self.template_lib = template_library
         self.window_size = window_size
+        self.use_opengl = use_opengl
+        self._read_scene = _scene_accessor(task_context)
+        
+        # 场景节点和边的缓存；TaskContext 提供 version 时按版本复用
+        self._config_version = None
+        self._cached_nodes: List[Dict[str, Any]] = []
+        self._cached_edges: List[Dict[str, Any]] = []
         
         # 初始化UI
         self._setup_ui()
         
-        # 异步渲染工作线程
-        self._render_thread = QThread()
-        self._render_worker = AsyncRenderWorker()
-        self._render_worker.moveToThread(self._render_thread)
+        # 重绘合并：消息只标记脏标志，由定时器按帧统一重绘
+        self._dirty_spatial = False
+        self._dirty_graph = False
+        self._redraw_timer = QTimer(self)
+        self._redraw_timer.setInterval(16)
+        self._redraw_timer.timeout.connect(self._flush_redraw)
+        self._redraw_timer.start()
         
-        # 连接信号
+        # 渲染消息分发器，消息在 GUI 线程上批量处理
+        self._render_worker = AsyncRenderWorker()
         self._render_worker.render_signal.connect(self._handle_render_message)
-        self._render_thread.started.connect(self._render_worker.start)
-        
-        # 启动渲染线程
-        self._render_thread.start()
+        self._render_worker.start()
+        self.redraw_signal.connect(self._trigger_redraw)
             
     def connect_to_task_context(self, task_context: "TaskContext"):
         """连接到TaskContext以监听事件"""
@@ -444,22 +809,33 @@ class MapRenderer(QMainWindow):
             task_context.subscribe(self._on_task_context_event)
             
     def _on_task_context_event(self, event: Dict[str, Any]):
-        """处理TaskContext事件"""
-        event_type = event.get('type')
-        obj_id = event.get('object_id')
-        data = event.get('data')
-        
-        # 触发重绘
-        self._trigger_redraw()
+        """处理TaskContext事件：事件内容不影响重绘，只发出重绘请求"""
+        self.redraw_signal.emit()
             
     def _trigger_redraw(self):
-        """触发重绘"""
-        # 发送重绘消息到渲染线程
-        message = RenderMessage(
-            event_type=RenderEvent.OBJECT_UPDATED,
-            data={'redraw': True}
-        )
-        self._render_worker.render_signal.emit(message)
+        """触发重绘，实际绘制在下一帧进行"""
+        self._dirty_spatial = True
+        self._dirty_graph = True
+        
+    def _flush_redraw(self):
+        """定时器回调：只重绘被标记为脏的视图，两个视图共用一次配置读取"""
+        if not (self._dirty_spatial or self._dirty_graph):
+            return
+        nodes, edges = self._scene_snapshot()
+        if self._dirty_spatial:
+            self._dirty_spatial = False
+            self.spatial_view.redraw(nodes)
+        if self._dirty_graph:
+            self._dirty_graph = False
+            self.graph_view.redraw(nodes, edges)
+            
+    def _scene_snapshot(self) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """读取场景节点和边；TaskContext 的 version 未变化时直接返回缓存"""
+        version = getattr(self.task_context, 'version', None)
+        if version is None or version != self._config_version:
+            self._cached_nodes, self._cached_edges = self._read_scene()
+            self._config_version = version
+        return self._cached_nodes, self._cached_edges
             
     def _ensure_qapplication(self):
         """确保QApplication实例存在"""
@@ -487,7 +863,7 @@ class MapRenderer(QMainWindow):
         layout = QHBoxLayout(central_widget)
         
         # 左侧空间地图视图
-        self.spatial_view = SpatialMapView(self.task_context, self.template_lib)
+        self.spatial_view = SpatialMapView(self.task_context, self.template_lib, self.use_opengl)
         spatial_frame = QFrame()
         spatial_frame.setFrameStyle(QFrame.Shape.Box)
         spatial_layout = QVBoxLayout(spatial_frame)
@@ -496,7 +872,7 @@ class MapRenderer(QMainWindow):
         layout.addWidget(spatial_frame, 3)
         
         # 右侧关系图视图
-        self.graph_view = GraphMapView(self.task_context, self.template_lib)
+        self.graph_view = GraphMapView(self.task_context, self.template_lib, self.use_opengl)
         graph_frame = QFrame()
         graph_frame.setFrameStyle(QFrame.Shape.Box)
         graph_layout = QVBoxLayout(graph_frame)
@@ -505,18 +881,22 @@ class MapRenderer(QMainWindow):
         layout.addWidget(graph_frame, 2)
         
         # 初始绘制
-        self.spatial_view.redraw()
-        self.graph_view.redraw()
+        nodes, edges = self._scene_snapshot()
+        self.spatial_view.redraw(nodes)
+        self.graph_view.redraw(nodes, edges)
         
     def _handle_render_message(self, message: RenderMessage):
         """处理渲染消息"""
         if message.event_type == RenderEvent.HIGHLIGHT_OBJECT:
             if message.obj_id:
+                # 重绘会清除高亮，先完成挂起的重绘以保持消息顺序
+                self._flush_redraw()
                 self.spatial_view.highlight_object(message.obj_id)
+        elif message.event_type in _RELATION_EVENTS:
+            # 关系只影响关系图
+            self._dirty_graph = True
         else:
-            # 重新绘制相关视图
-            self.spatial_view.redraw()
-            self.graph_view.redraw()
+            self._trigger_redraw()
             
     def _on_object_event(self, **kwargs):
         """处理对象事件"""
@@ -532,12 +912,8 @@ class MapRenderer(QMainWindow):
             
     def _on_relation_event(self, **kwargs):
         """处理关系事件"""
-        message = RenderMessage(
-            event_type=RenderEvent.RELATION_UPDATED,
-            data=kwargs
-        )
-        # 直接发送消息到UI线程
-        self._render_worker.render_signal.emit(message)
+        # 关系只影响关系图，标记后等待下一帧重绘
+        self._dirty_graph = True
         
     async def post_event(self, event_data: Dict[str, Any]):
         """异步事件接口，供外部调用"""
@@ -557,16 +933,28 @@ class MapRenderer(QMainWindow):
                 data=event_data
             )
             
-        await self._render_worker.post_message(message)
+        self._render_worker.post_message(message)
         
     def closeEvent(self, event):
         """窗口关闭事件"""
-        # 停止渲染线程
-        self._render_thread.quit()
-        self._render_thread.wait()
+        # 停止重绘定时器和消息处理
+        self._redraw_timer.stop()
+        self._render_worker.stop()
         super().closeEvent(event)
         
     def run(self):
-        """启动渲染器（同步方法，用于兼容性）"""
+        """
+        启动渲染器（同步方法，用于兼容性）。
+
+        安装了 qasync 时由 qasync.QEventLoop 同时驱动 Qt 和 asyncio，post_event 等协程
+        可以与界面运行在同一个循环上；否则退回普通的 Qt 事件循环。
+        """
         self.show()
-        return QApplication.instance().exec()
\ No newline at end of file
+        app = QApplication.instance()
+        if not QASYNC_AVAILABLE:
+            return app.exec()
+        
+        loop = qasync.QEventLoop(app)
+        asyncio.set_event_loop(loop)
+        with loop:
+            loop.run_forever()
\ No newline at end of file
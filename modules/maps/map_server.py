@@ -10,14 +10,37 @@ MapServer - 统一的场景图服务接口
 
 import asyncio
 import logging
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
+from collections import defaultdict
 from dataclasses import dataclass
 
 import numpy as np
+from scipy.spatial import cKDTree
 from scipy.spatial.transform import Rotation
 
+# 重置地图时解析场景图 JSON：优先使用 orjson（可直接接受 str 或 bytes），否则回退到标准库
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    import json
+    _loads = json.loads
+
 from .scene_graph import SceneGraph, SpatialTransform
 from .layered_map import LayeredGridMap
+from ._kernels import radius_filter
+
+
+# 节点数达到该值时才为按位置查询建立 KD 树，较小的图直接向量化扫描全部坐标
+_KDTREE_MIN_NODES = 256
+
+# 按位置查询的默认半径（米）：在该范围内认为是同一位置；场景图坐标均为二维
+_RADIUS = 5.0
+_RADIUS_SQ = _RADIUS * _RADIUS
+_DIM = 2
+
+# 按位置查询时节点类型的编码，其余类型编码为 -1，不参与查询
+_TYPE_CODES = {'object': 0, 'region': 1, 'robot': 2}
 
 
 @dataclass
@@ -69,80 +92,206 @@ class MapServer:
         self.grid_map = None
         if config.grid_map_config:
             self.grid_map = LayeredGridMap(config.grid_map_config)
+            self.grid_map.on_change = self._on_grid_region_changed
         
         # 事件订阅者
-        self._subscribers: List[callable] = []
+        # 以 dict 作为有序集合：O(1) 增删，并按订阅顺序通知
+        self._subscribers: Dict[Callable, None] = {}
         
         # 同步状态
         self._sync_enabled = True
         
+        # 只读查询共用的场景图快照，经由本服务的修改会使其失效并递增版本号
+        self._graph_cache = None
+        self._graph_version = 0
+        
+        # 按位置查询用的坐标索引，按场景图版本惰性重建
+        self._coord_tree: Optional[cKDTree] = None
+        self._coord_nodes: List[Tuple[Any, Dict[str, Any]]] = []
+        self._coord_array: np.ndarray = np.empty((0, 2), dtype=np.float64)
+        self._type_codes: np.ndarray = np.empty(0, dtype=np.int8)
+        self._coord_index_version = -1
+        
+        # 节点类型索引（类型 -> 按加入顺序排列的节点）和节点 -> (类型, 坐标)，随增删改增量维护
+        self._nodes_by_type: Dict[str, Dict[Any, None]] = defaultdict(dict)
+        self._node_index: Dict[Any, Tuple[str, np.ndarray]] = {}
+        # 节点在场景图中的先后序号；类型变化的节点会追加到新类型末尾，读取时按序号恢复场景图顺序
+        self._node_rank: Dict[Any, int] = {}
+        self._next_rank = 0
+        self._unsorted_types: Set[str] = set()
+        self._rebuild_node_index()
+        
         self.logger.info("增强版地图服务器已初始化")
     
     # ==================== 事件系统 ====================
     
     def subscribe(self, callback: callable):
         """订阅地图事件"""
-        if callback not in self._subscribers:
-            self._subscribers.append(callback)
+        self._subscribers.setdefault(callback, None)
     
     def unsubscribe(self, callback: callable):
         """取消订阅"""
-        if callback in self._subscribers:
-            self._subscribers.remove(callback)
+        self._subscribers.pop(callback, None)
     
-    def _notify_subscribers(self, event: Dict[str, Any]):
-        """通知订阅者"""
-        for callback in self._subscribers:
+    def _notify_subscribers(self, event_type: str, **fields: Any):
+        """通知订阅者（遍历快照，回调中可以安全地增删订阅）；无订阅者时不构造事件"""
+        if not self._subscribers:
+            return
+        event = {"type": event_type, **fields}
+        for callback in tuple(self._subscribers):
             try:
                 callback(event)
             except Exception as e:
                 self.logger.error(f"事件回调执行失败: {e}")
     
+    def _on_grid_region_changed(self, obj_id: Any, grid_rect: Tuple[int, int, int, int]):
+        """栅格地图局部变化时通知订阅者，只携带变化的栅格矩形"""
+        self._notify_subscribers("GRID_REGION_CHANGED", object_id=obj_id, grid_rect=grid_rect)
+    
+    # ==================== 场景图快照 ====================
+    
+    def _graph(self):
+        """返回场景图的只读快照，只在失效后重新导出"""
+        if self._graph_cache is None:
+            self._graph_cache = self.scene_graph.export_graph()
+        return self._graph_cache
+    
+    def _invalidate_graph(self):
+        """场景图被修改后丢弃快照并递增版本号"""
+        self._graph_cache = None
+        self._graph_version += 1
+    
+    # ==================== 节点类型索引 ====================
+    
+    def _rebuild_node_index(self):
+        """从场景图全量重建节点类型和坐标索引"""
+        self._nodes_by_type.clear()
+        self._node_index.clear()
+        self._node_rank.clear()
+        self._next_rank = 0
+        self._unsorted_types.clear()
+        for node, attrs in self._graph().nodes(data=True):
+            self._set_node_index(node, attrs)
+    
+    def _set_node_index(self, node: Any, attrs: Dict[str, Any]):
+        """按节点当前属性写入索引，类型变化时移到新类型下"""
+        node_type = attrs.get('type', 'object')
+        old = self._node_index.get(node)
+        if old is None:
+            # 新节点位于场景图末尾
+            self._node_rank[node] = self._next_rank
+            self._next_rank += 1
+        elif old[0] != node_type:
+            del self._nodes_by_type[old[0]][node]
+            self._unsorted_types.add(node_type)
+        self._nodes_by_type[node_type][node] = None
+        self._node_index[node] = (node_type, np.array(attrs.get('coords', [0.0, 0.0]), dtype=np.float64))
+    
+    def _index_node(self, node: Any):
+        """节点被添加或更新后，从场景图读取变换后的属性更新索引"""
+        attrs, success = self.scene_graph.lookup_node(node)
+        if success:
+            self._set_node_index(node, attrs)
+    
+    def _unindex_node(self, node: Any):
+        """节点被删除后移出索引"""
+        entry = self._node_index.pop(node, None)
+        if entry is not None:
+            del self._nodes_by_type[entry[0]][node]
+            del self._node_rank[node]
+    
+    def _nodes_of_type(self, node_type: str) -> Dict[Any, None]:
+        """按场景图顺序返回某一类型的节点，只在有节点改变类型后才重新排序"""
+        if node_type in self._unsorted_types:
+            self._unsorted_types.discard(node_type)
+            self._nodes_by_type[node_type] = dict.fromkeys(
+                sorted(self._nodes_by_type[node_type], key=self._node_rank.__getitem__)
+            )
+        return self._nodes_by_type[node_type]
+    
     # ==================== 场景图操作（兼容现有SceneGraph） ====================
     
     def add_object(self, obj_id: Any, **attrs: Any) -> None:
         """添加对象"""
         self.scene_graph.add_object(obj_id, **attrs)
+        self._invalidate_graph()
+        self._index_node(obj_id)
         
         # 同步到栅格地图
         if self.grid_map and self._sync_enabled:
             self._sync_object_to_grid(obj_id, attrs)
         
         # 通知事件
-        self._notify_subscribers({
-            "type": "OBJECT_ADDED",
-            "object_id": obj_id,
-            "data": attrs
-        })
+        self._notify_subscribers("OBJECT_ADDED", object_id=obj_id, data=attrs)
     
     def remove_object(self, obj_id: Any) -> None:
         """删除对象"""
         self.scene_graph.remove_object(obj_id)
+        self._invalidate_graph()
+        self._unindex_node(obj_id)
         
         # 同步到栅格地图
         if self.grid_map and self._sync_enabled:
             self._sync_remove_from_grid(obj_id)
         
         # 通知事件
-        self._notify_subscribers({
-            "type": "OBJECT_REMOVED",
-            "object_id": obj_id
-        })
+        self._notify_subscribers("OBJECT_REMOVED", object_id=obj_id)
+    
+    def add_objects_bulk(self, items: List[Tuple[Any, Dict[str, Any]]]) -> None:
+        """
+        批量添加对象：场景图、节点索引和栅格地图各更新一次，订阅者只收到一个 BULK_ADDED 事件。
+
+        Args:
+            items (List[Tuple[Any, Dict[str, Any]]]): (对象ID, 属性) 列表，属性格式与 add_object 相同。
+        """
+        items = list(items)
+        if not items:
+            return
+        
+        self.scene_graph.add_objects_bulk(items)
+        self._invalidate_graph()
+        graph = self._graph()
+        for obj_id, _ in items:
+            self._set_node_index(obj_id, graph.nodes[obj_id])
+        
+        # 同步到栅格地图
+        if self.grid_map and self._sync_enabled:
+            self._sync_objects_to_grid(items)
+        
+        # 通知事件
+        self._notify_subscribers("BULK_ADDED", ids=[obj_id for obj_id, _ in items])
+    
+    def remove_objects_bulk(self, obj_ids: List[Any]) -> None:
+        """批量删除对象，订阅者只收到一个 BULK_REMOVED 事件"""
+        obj_ids = list(obj_ids)
+        if not obj_ids:
+            return
+        
+        self.scene_graph.remove_objects_bulk(obj_ids)
+        self._invalidate_graph()
+        for obj_id in obj_ids:
+            self._unindex_node(obj_id)
+        
+        # 同步到栅格地图
+        if self.grid_map and self._sync_enabled:
+            for obj_id in obj_ids:
+                self._sync_remove_from_grid(obj_id)
+        
+        # 通知事件
+        self._notify_subscribers("BULK_REMOVED", ids=obj_ids)
     
     def update_object(self, obj_id: Any, **attrs: Any) -> None:
         """更新对象"""
         self.scene_graph.update_object(obj_id, **attrs)
+        self._invalidate_graph()
+        self._index_node(obj_id)
         
         # 同步到栅格地图
         if self.grid_map and self._sync_enabled:
             self._sync_object_to_grid(obj_id, attrs)
         
         # 通知事件
-        self._notify_subscribers({
-            "type": "OBJECT_UPDATED",
-            "object_id": obj_id,
-            "data": attrs
-        })
+        self._notify_subscribers("OBJECT_UPDATED", object_id=obj_id, data=attrs)
     
     def get_object(self, obj_id: Any) -> Dict[str, Any]:
         """获取对象"""
@@ -151,25 +300,18 @@ class MapServer:
     def add_relation(self, source: Any, target: Any, **attrs: Any) -> None:
         """添加关系"""
         self.scene_graph.add_relation(source, target, **attrs)
+        self._invalidate_graph()
         
         # 通知事件
-        self._notify_subscribers({
-            "type": "RELATION_ADDED",
-            "source": source,
-            "target": target,
-            "data": attrs
-        })
+        self._notify_subscribers("RELATION_ADDED", source=source, target=target, data=attrs)
     
     def remove_relation(self, source: Any, target: Any) -> None:
         """删除关系"""
         self.scene_graph.remove_relation(source, target)
+        self._invalidate_graph()
         
         # 通知事件
-        self._notify_subscribers({
-            "type": "RELATION_REMOVED",
-            "source": source,
-            "target": target
-        })
+        self._notify_subscribers("RELATION_REMOVED", source=source, target=target)
     
     # ==================== 查询操作 ====================
     
@@ -181,12 +323,12 @@ class MapServer:
         """按嵌套属性查找对象"""
         return self.scene_graph.find_objects_by_nested_property(keys, value)
     
-    def query_by_position(self, world_pos: List[float]) -> Dict[str, Any]:
-        """按位置查询"""
+    def query_by_position(self, world_pos: List[float], radius: float = _RADIUS) -> Dict[str, Any]:
+        """按位置查询，radius 为场景图节点的匹配半径"""
         result = {}
         
         # 场景图查询
-        result["scene_graph"] = self._query_scene_graph_by_position(world_pos)
+        result["scene_graph"] = self._query_scene_graph_by_position(world_pos, radius)
         
         # 栅格地图查询
         if self.grid_map:
@@ -194,26 +336,60 @@ class MapServer:
         
         return result
     
-    def _query_scene_graph_by_position(self, world_pos: List[float]) -> Dict[str, Any]:
-        """在场景图中按位置查询"""
+    def _query_scene_graph_by_position(self, world_pos: List[float], radius: float = _RADIUS) -> Dict[str, Any]:
+        """
+        在场景图中按位置查询。
+
+        大图先用 KD 树取出半径内的候选节点，再交给半径过滤内核按类型分组；
+        小图直接由内核扫描全部节点。只对命中的节点开方得到距离；没有坐标的节点不参与查询。
+        """
         result = {"objects": [], "regions": [], "robots": []}
         
-        for node, attrs in self.scene_graph.export_graph().nodes(data=True):
-            coords = attrs.get('coords', [0, 0])
-            distance = np.linalg.norm(np.array(coords) - np.array(world_pos))
-            
-            # 在5米范围内认为是同一位置
-            if distance <= 5.0:
-                node_type = attrs.get('type', 'object')
-                if node_type == 'object':
-                    result["objects"].append({"id": node, "attrs": attrs, "distance": distance})
-                elif node_type == 'region':
-                    result["regions"].append({"id": node, "attrs": attrs, "distance": distance})
-                elif node_type == 'robot':
-                    result["robots"].append({"id": node, "attrs": attrs, "distance": distance})
+        self._ensure_coord_index()
+        
+        # 默认半径直接使用预先算好的半径平方；每类按节点原有顺序返回
+        radius_sq = _RADIUS_SQ if radius == _RADIUS else float(radius) * float(radius)
+        px, py = float(world_pos[0]), float(world_pos[1])
+        if self._coord_tree is not None:
+            idx = np.asarray(self._coord_tree.query_ball_point((px, py), r=radius, return_sorted=True), dtype=np.intp)
+            obj_idx, region_idx, robot_idx, distances = radius_filter(
+                self._coord_array[idx], self._type_codes[idx], px, py, radius_sq
+            )
+            obj_idx, region_idx, robot_idx = idx[obj_idx], idx[region_idx], idx[robot_idx]
+        else:
+            obj_idx, region_idx, robot_idx, distances = radius_filter(
+                self._coord_array, self._type_codes, px, py, radius_sq
+            )
+        
+        k = 0
+        for key, hits in (("objects", obj_idx), ("regions", region_idx), ("robots", robot_idx)):
+            bucket = result[key]
+            for i in hits:
+                node, attrs = self._coord_nodes[i]
+                bucket.append({"id": node, "attrs": dict(attrs), "distance": distances[k]})
+                k += 1
         
         return result
     
+    def _ensure_coord_index(self) -> None:
+        """场景图版本变化时重建节点列表、坐标数组，节点较多时还会重建 KD 树"""
+        if self._coord_index_version == self._graph_version:
+            return
+        
+        self._coord_nodes = [(node, attrs) for node, attrs in self._graph().nodes(data=True) if attrs.get('coords') is not None]
+        self._coord_array = np.array(
+            [attrs['coords'][:_DIM] for _, attrs in self._coord_nodes], dtype=np.float64
+        ).reshape(-1, _DIM)
+        self._type_codes = np.fromiter(
+            (_TYPE_CODES.get(attrs.get('type', 'object'), -1) for _, attrs in self._coord_nodes),
+            dtype=np.int8, count=len(self._coord_nodes)
+        )
+        self._coord_tree = (
+            cKDTree(self._coord_array, leafsize=16, balanced_tree=False, compact_nodes=False)
+            if len(self._coord_nodes) >= _KDTREE_MIN_NODES else None
+        )
+        self._coord_index_version = self._graph_version
+    
     # ==================== 路径规划（兼容spine） ====================
     
     def get_path(self, start_node: str, end_node: str, only_regions: bool = False) -> List[str]:
@@ -234,10 +410,7 @@ class MapServer:
         """更新当前位置"""
         success = self.scene_graph.update_location(new_location)
         if success:
-            self._notify_subscribers({
-                "type": "LOCATION_UPDATED",
-                "location": new_location
-            })
+            self._notify_subscribers("LOCATION_UPDATED", location=new_location)
         return success
     
     def get_current_location(self) -> Optional[str]:
@@ -249,10 +422,7 @@ class MapServer:
     def set_spatial_transform(self, transform: SpatialTransform):
         """设置空间变换"""
         self.scene_graph.set_spatial_transform(transform)
-        self._notify_subscribers({
-            "type": "SPATIAL_TRANSFORM_UPDATED",
-            "transform": transform
-        })
+        self._notify_subscribers("SPATIAL_TRANSFORM_UPDATED", transform=transform)
     
     def transform_coords(self, coords: np.ndarray, inverse: bool = False) -> np.ndarray:
         """变换坐标"""
@@ -271,11 +441,25 @@ class MapServer:
         if self._sync_enabled:
             self._sync_grid_to_scene_graph(obj_id, parts_shapes, layer_type)
     
-    def query_local_region(self, center: List[float], size: int) -> Dict[str, np.ndarray]:
+    def add_objects_to_grid(self, objects: List[Dict[str, Any]]) -> None:
+        """批量添加对象到栅格地图，订阅者只收到一次区域变化通知"""
+        if not self.grid_map:
+            raise RuntimeError("栅格地图未初始化")
+        
+        self.grid_map.add_objects(objects)
+        
+        # 同步到场景图
+        if self._sync_enabled:
+            for obj_data in objects:
+                self._sync_grid_to_scene_graph(
+                    obj_data.get('obj_id'), obj_data.get('parts_shapes'), obj_data.get('layer_type')
+                )
+    
+    def query_local_region(self, center: List[float], size: int, copy: bool = True) -> Dict[str, np.ndarray]:
         """查询局部区域"""
         if not self.grid_map:
             return {}
-        return self.grid_map.query_local_region(center, size)
+        return self.grid_map.query_local_region(center, size, copy=copy)
     
     # ==================== 数据同步 ====================
     
@@ -284,25 +468,43 @@ class MapServer:
         if not self.grid_map:
             return
         
-        # 从场景图属性提取形状信息
+        # 从场景图属性提取形状信息，没有形状的对象不进入栅格地图
         shape = attrs.get('shape')
-        if not shape:
+        if shape is None:
             return
         
-        # 转换为栅格地图格式
-        parts_shapes = {"main": shape}
         layer_type = attrs.get('layer_type', 'dynamic')
         
         try:
             # 如果对象已存在，先删除
-            if obj_id in self.grid_map._objects:
+            if self.grid_map.contains(obj_id):
                 self.grid_map.delete_object(obj_id)
             
-            # 添加对象
-            self.grid_map.add_object(obj_id, parts_shapes, layer_type)
+            # 转换为栅格地图格式并添加对象
+            self.grid_map.add_object(obj_id, {"main": shape}, layer_type)
         except Exception as e:
             self.logger.warning(f"同步对象到栅格地图失败: {e}")
     
+    def _sync_objects_to_grid(self, items: List[Tuple[Any, Dict[str, Any]]]):
+        """批量同步对象到栅格地图，足迹按图层一次性绘制"""
+        try:
+            objects = []
+            for obj_id, attrs in items:
+                shape = attrs.get('shape')
+                if shape is None:
+                    continue
+                if self.grid_map.contains(obj_id):
+                    self.grid_map.delete_object(obj_id)
+                objects.append({
+                    'obj_id': obj_id,
+                    'parts_shapes': {"main": shape},
+                    'layer_type': attrs.get('layer_type', 'dynamic')
+                })
+            
+            self.grid_map.add_objects(objects)
+        except Exception as e:
+            self.logger.warning(f"批量同步对象到栅格地图失败: {e}")
+    
     def _sync_remove_from_grid(self, obj_id: Any):
         """从栅格地图同步删除"""
         if not self.grid_map:
@@ -365,6 +567,8 @@ class MapServer:
         """更新节点（兼容spine）"""
         # 添加节点
         self.scene_graph.add_object(node, **attrs)
+        self._invalidate_graph()
+        self._index_node(node)
         
         # 添加边
         for edge in edges:
@@ -373,30 +577,38 @@ class MapServer:
     def update_with_edge(self, edge: Tuple[str, str], attrs: Dict[str, Any] = {}) -> None:
         """更新边（兼容spine）"""
         self.scene_graph.add_relation(edge[0], edge[1], **attrs)
+        self._invalidate_graph()
     
     def remove_edge(self, start: str, end: str) -> None:
         """删除边（兼容spine）"""
         self.scene_graph.remove_relation(start, end)
+        self._invalidate_graph()
     
     def update_node_description(self, node: str, **attrs: Any) -> None:
         """更新节点描述（兼容spine）"""
         self.scene_graph.update_object(node, **attrs)
+        self._invalidate_graph()
+        self._index_node(node)
     
     # ==================== 高级功能 ====================
     
     def get_region_nodes_and_locs(self) -> Tuple[np.ndarray, np.ndarray]:
-        """获取区域节点和位置（兼容spine）"""
-        region_nodes = []
-        region_locs = []
-        
-        for node in self.scene_graph.export_graph().nodes():
-            if self.scene_graph.get_node_type(node) == "region":
-                coords, success = self.scene_graph.get_node_coords(node)
-                if success:
-                    region_nodes.append(node)
-                    region_locs.append(coords)
+        """
+        获取区域节点和位置（兼容spine），只遍历类型索引中的区域节点。
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (n,) 的 object 数组，元素为原始节点ID（不再转换为定长字符串）；
+            以及 (n, 2) 的 float64 坐标数组，两者按场景图中的节点顺序一一对应。
+        """
+        regions = self._nodes_of_type('region')
+        n = len(regions)
+        region_nodes = np.empty(n, dtype=object)
+        region_locs = np.empty((n, 2), dtype=np.float64)
+        for i, node in enumerate(regions):
+            region_nodes[i] = node
+            region_locs[i] = self._node_index[node][1][:2]
         
-        return np.array(region_nodes), np.array(region_locs)
+        return region_nodes, region_locs
     
     def reset(self, graph_as_json: str = None, current_location: str = None, 
               rotation: Rotation = None, utm_origin: np.ndarray = None) -> bool:
@@ -404,8 +616,7 @@ class MapServer:
         try:
             if graph_as_json:
                 # 解析JSON并重新初始化场景图
-                import json
-                data = json.loads(graph_as_json)
+                data = _loads(graph_as_json)
                 
                 # 创建新的空间变换
                 spatial_transform = SpatialTransform(
@@ -419,21 +630,21 @@ class MapServer:
                     spatial_transform=spatial_transform,
                     current_location=current_location
                 )
+                self._invalidate_graph()
+                self._rebuild_node_index()
             else:
                 # 只更新位置和变换
                 if current_location:
                     self.scene_graph.update_location(current_location)
-                if rotation or utm_origin is not None:
-                    new_transform = SpatialTransform(
-                        origin=utm_origin if utm_origin is not None else self.scene_graph.spatial_transform.origin,
-                        rotation=rotation if rotation is not None else self.scene_graph.spatial_transform.rotation
-                    )
-                    self.scene_graph.set_spatial_transform(new_transform)
+                # Rotation 对象不能做真值判断，必须显式与 None 比较
+                if rotation is not None or utm_origin is not None:
+                    cur = self.scene_graph.spatial_transform
+                    origin = utm_origin if utm_origin is not None else cur.origin
+                    rot = rotation if rotation is not None else cur.rotation
+                    self.scene_graph.set_spatial_transform(SpatialTransform(origin=origin, rotation=rot))
             
-            self._notify_subscribers({
-                "type": "MAP_RESET",
-                "data": {"current_location": current_location}
-            })
+            self._invalidate_graph()
+            self._notify_subscribers("MAP_RESET", data={"current_location": current_location})
             
             return True
             
@@ -445,21 +656,17 @@ class MapServer:
     
     def get_statistics(self) -> Dict[str, Any]:
         """获取统计信息"""
-        graph = self.scene_graph.export_graph()
+        graph = self._graph()
         
         stats = {
             "total_nodes": len(graph.nodes),
             "total_edges": len(graph.edges),
-            "node_types": {},
+            # 统计节点类型
+            "node_types": {node_type: len(nodes) for node_type, nodes in self._nodes_by_type.items() if nodes},
             "current_location": self.scene_graph.get_current_location(),
             "has_grid_map": self.grid_map is not None
         }
         
-        # 统计节点类型
-        for node, attrs in graph.nodes(data=True):
-            node_type = attrs.get('type', 'object')
-            stats["node_types"][node_type] = stats["node_types"].get(node_type, 0) + 1
-        
         return stats
     
     # ==================== 调试和日志 ====================
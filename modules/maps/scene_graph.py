@@ -111,6 +111,34 @@ class SceneGraph:
         
         self.logger.debug(f"添加对象: {obj_id} ({node_type})")
     
+    def add_objects_bulk(self, items: List[Tuple[Any, Dict[str, Any]]]) -> None:
+        """批量添加对象节点，坐标按维度分组后每组一次性做空间变换，不修改传入的属性字典"""
+        items = [(obj_id, dict(attrs)) for obj_id, attrs in items]
+        if not items:
+            return
+        
+        # 坐标维度可能不同（如二维与三维混合），按维度分组后分别变换
+        groups: Dict[int, List[Tuple[Dict[str, Any], np.ndarray]]] = {}
+        for _, attrs in items:
+            coords = np.asarray(attrs.get('coords', [0.0, 0.0]), dtype=np.float64).reshape(-1)
+            groups.setdefault(coords.shape[0], []).append((attrs, coords))
+        for group in groups.values():
+            transformed = self.spatial_transform.apply(np.stack([coords for _, coords in group])).tolist()
+            for (attrs, _), obj_coords in zip(group, transformed):
+                attrs['coords'] = obj_coords
+        
+        for _, attrs in items:
+            attrs.setdefault('type', 'object')
+        
+        self.__graph.add_nodes_from(items)
+        
+        for obj_id, attrs in items:
+            node_type = attrs['type']
+            if node_type in self.node_types:
+                self.node_types[node_type].add(obj_id)
+        
+        self.logger.debug(f"批量添加对象: {len(items)} 个")
+    
     def remove_object(self, obj_id: Any) -> None:
         """删除对象节点"""
         if not self.__graph.has_node(obj_id):
@@ -123,6 +151,19 @@ class SceneGraph:
         self.__graph.remove_node(obj_id)
         self.logger.debug(f"删除对象: {obj_id}")
     
+    def remove_objects_bulk(self, obj_ids: List[Any]) -> None:
+        """批量删除对象节点；任一节点不存在时不做任何修改"""
+        obj_ids = list(obj_ids)
+        missing = [obj_id for obj_id in obj_ids if not self.__graph.has_node(obj_id)]
+        if missing:
+            raise KeyError(f"Objects {missing} do not exist.")
+        
+        for type_set in self.node_types.values():
+            type_set.difference_update(obj_ids)
+        
+        self.__graph.remove_nodes_from(obj_ids)
+        self.logger.debug(f"批量删除对象: {len(obj_ids)} 个")
+    
     def update_object(self, obj_id: Any, **attrs: Any) -> None:
         """更新对象属性"""
         if not self.__graph.has_node(obj_id):
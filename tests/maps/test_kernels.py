@@ -0,0 +1,65 @@
+"""
+半径过滤内核：numba 实现必须与 NumPy 实现逐项一致，包括 NaN 坐标和恰好在圆周上的节点。
+"""
+import importlib.util
+import pathlib
+import sys
+
+import numpy as np
+import pytest
+
+pytest.importorskip("numba")
+
+# 直接按文件加载，避免导入 modules 包时拉起 PyQt 等可选依赖；
+# 模块名与正常导入时相同，numba 的磁盘缓存可以复用
+_KERNELS_PATH = pathlib.Path(__file__).resolve().parents[2] / "modules" / "maps" / "_kernels.py"
+_MODULE_NAME = "modules.maps._kernels"
+if _MODULE_NAME in sys.modules:
+    kernels = sys.modules[_MODULE_NAME]
+else:
+    _spec = importlib.util.spec_from_file_location(_MODULE_NAME, _KERNELS_PATH)
+    kernels = importlib.util.module_from_spec(_spec)
+    sys.modules[_MODULE_NAME] = kernels
+    _spec.loader.exec_module(kernels)
+
+
+def _assert_same(coords, types, px, py, r2):
+    expected = kernels._radius_filter_numpy(coords, types, px, py, r2)
+    actual = kernels._radius_filter_jit(coords, types, px, py, r2)
+    for exp_idx, act_idx in zip(expected[:3], actual[:3]):
+        np.testing.assert_array_equal(act_idx, exp_idx)
+    np.testing.assert_array_equal(actual[3], expected[3])
+
+
+def test_matches_numpy_on_random_points():
+    rng = np.random.default_rng(0)
+    coords = rng.uniform(0, 50, (5000, 2))
+    types = rng.integers(-1, 3, 5000).astype(np.int8)
+    _assert_same(coords, types, 20.0, 20.0, 25.0)
+
+
+def test_nan_coords_are_never_hits():
+    rng = np.random.default_rng(1)
+    coords = rng.uniform(15, 25, (5000, 2))
+    coords[::7, 0] = np.nan
+    coords[3::7, 1] = np.nan
+    types = rng.integers(0, 3, 5000).astype(np.int8)
+    _assert_same(coords, types, 20.0, 20.0, 25.0)
+
+    hits = np.concatenate(kernels._radius_filter_jit(coords, types, 20.0, 20.0, 25.0)[:3])
+    assert not np.isnan(coords[hits]).any()
+
+
+def test_points_on_circle():
+    rng = np.random.default_rng(2)
+    angles = rng.uniform(0, 2 * np.pi, 20000)
+    coords = np.stack([3.0 + 5.0 * np.cos(angles), -7.0 + 5.0 * np.sin(angles)], axis=1)
+    types = rng.integers(0, 3, 20000).astype(np.int8)
+    _assert_same(coords, types, 3.0, -7.0, 25.0)
+
+
+def test_empty_input():
+    coords = np.empty((0, 2), dtype=np.float64)
+    types = np.empty(0, dtype=np.int8)
+    result = kernels._radius_filter_jit(coords, types, 0.0, 0.0, 25.0)
+    assert all(part.shape == (0,) for part in result)